@@ -452,7 +452,7 @@ verify_deployment() {
     local attempt=1
     
     while [ $attempt -le $max_attempts ]; do
-        if curl -f http://localhost:8000/health >/dev/null 2>&1; then
+        if curl -f --unix-socket /run/pinmaker/gunicorn.sock http://localhost/health >/dev/null 2>&1; then
             log "✅ Health check passed (attempt $attempt)"
             break
         else
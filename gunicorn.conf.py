@@ -1,22 +1,53 @@
 # Gunicorn configuration for Pinmaker
+import gc
 import multiprocessing
 import os
+import resource
+import signal
+import threading
+import time
 
-# Server socket - bind to all interfaces for direct API access
-bind = "0.0.0.0:8000"
+from uvicorn.workers import UvicornWorker
+
+
+class PinmakerWorker(UvicornWorker):
+    # Pin uvloop/httptools so a broken install fails at boot instead of
+    # silently falling back to the pure-Python loop and parser
+    CONFIG_KWARGS = {"loop": "uvloop", "http": "httptools"}
+
+
+# Server socket - UNIX socket behind Caddy (PINMAKER_BIND=0.0.0.0:8000 for direct access)
+bind = os.environ.get("PINMAKER_BIND", "unix:/run/pinmaker/gunicorn.sock")
 backlog = 2048
 
-# Worker processes - optimized for 4GB RAM
-workers = 2
-worker_class = "uvicorn.workers.UvicornWorker"
-worker_connections = 100
-max_requests = 500
-max_requests_jitter = 50
+# Sizing profile - low_mem by default: each worker loads its own copy of the
+# analyzer models, so one per core can exhaust a small (4 GB) host.
+# PINMAKER_PROFILE=cpu runs one worker per core on larger machines
+PROFILES = {
+    "cpu": {"workers": max(2, multiprocessing.cpu_count()), "worker_connections": 500},
+    "low_mem": {"workers": 2, "worker_connections": 100},
+}
+PROFILE_NAME = os.environ.get("PINMAKER_PROFILE", "low_mem")
+if PROFILE_NAME not in PROFILES:
+    raise ValueError(
+        f"Unknown PINMAKER_PROFILE {PROFILE_NAME!r}; "
+        f"expected one of: {', '.join(sorted(PROFILES))}"
+    )
+PROFILE = PROFILES[PROFILE_NAME]
+
+# Worker processes - sized by the profile; preload_app shares imported libraries
+# copy-on-write (PINMAKER_WORKERS overrides the profile)
+workers = int(os.environ.get("PINMAKER_WORKERS", PROFILE["workers"]))
+worker_class = PinmakerWorker
+worker_connections = PROFILE["worker_connections"]
+max_requests = 2000  # fallback; the RSS watchdog below recycles leaky workers
+max_requests_jitter = 200
 preload_app = True
 worker_tmp_dir = "/dev/shm"
 
-# Logging
-accesslog = "/opt/Pinmaker/logs/gunicorn_access.log"
+# Logging - Caddy already logs every request; set PINMAKER_ACCESSLOG to a
+# path (or "-" for stdout) to re-enable gunicorn's access log for debugging
+accesslog = os.environ.get("PINMAKER_ACCESSLOG") or None
 errorlog = "/opt/Pinmaker/logs/gunicorn_error.log"
 loglevel = "info"
 access_log_format = '%(h)s %(l)s %(u)s %(t)s "%(r)s" %(s)s %(b)s "%(f)s" "%(a)s" %(D)s'
@@ -39,3 +70,43 @@ graceful_timeout = 30
 # SSL (handled by caddy)
 keyfile = None
 certfile = None
+
+# Memory-based restarts: recycle a worker once its peak RSS passes this (0 disables)
+MAX_WORKER_RSS_MB = int(os.environ.get("PINMAKER_MAX_WORKER_RSS_MB", "1536"))
+RSS_CHECK_INTERVAL = 30  # seconds
+
+
+# Server hooks - keep preloaded pages shared copy-on-write across workers
+def when_ready(server):
+    # Collect once in the arbiter so workers inherit a clean, frozen heap
+    gc.collect()
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    # Keep the worker's GC off the inherited objects and collect less often
+    gc.freeze()
+    gc.set_threshold(100_000, 50, 10)
+
+
+def post_worker_init(worker):
+    # UvicornWorker never calls pre_request, so watch memory from a thread
+    if not MAX_WORKER_RSS_MB:
+        return
+
+    def watch_rss():
+        while True:
+            time.sleep(RSS_CHECK_INTERVAL)
+            rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+            if rss_mb > MAX_WORKER_RSS_MB:
+                worker.log.info(
+                    "Worker %s peak RSS %.0f MB exceeds %d MB, restarting",
+                    worker.pid,
+                    rss_mb,
+                    MAX_WORKER_RSS_MB,
+                )
+                # SIGTERM lets uvicorn finish in-flight requests before exiting
+                os.kill(worker.pid, signal.SIGTERM)
+                return
+
+    threading.Thread(target=watch_rss, name="rss-watchdog", daemon=True).start()
@@ -7,20 +7,28 @@ for image analysis, template generation, and preview creation.
 """
 
 import os
+import re
 import sys
 import logging
 import asyncio
+import contextlib
+import io
+import time
+import uuid
 from pathlib import Path
 from contextlib import asynccontextmanager
+from functools import lru_cache
 from typing import Optional
 
+import aiofiles
+import orjson
 from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import ORJSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from pydantic import BaseModel
+from PIL import Image, features
 import uvicorn
 
 # Import our custom modules
@@ -28,18 +36,23 @@ from src.image_analyzer import ImageAnalyzer
 from src.template_generator import TemplateGenerator
 from src.preview_generator import PreviewGenerator
 from src.stock_photo_service import StockPhotoService
-from src.font_manager import FontManager
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler("/opt/Pinmaker/logs/app.log"),
-        logging.StreamHandler(sys.stdout),
-    ],
-)
+from src.font_manager import FontManager, SUPPORTED_FORMATS
+from src.analysis_runner import AnalysisRunner
+from src.upload_limits import UploadSizeLimitMiddleware
+
+# Configure logging (leave an existing config, e.g. uvicorn --log-config, alone)
+if not logging.getLogger().handlers:
+    logging.basicConfig(
+        level=os.getenv("LOG_LEVEL", "INFO").upper(),
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        handlers=[
+            logging.FileHandler("/opt/Pinmaker/logs/app.log"),
+            logging.StreamHandler(sys.stdout),
+        ],
+    )
 logger = logging.getLogger(__name__)
+# Per-request access lines are synchronous and duplicate Caddy's log
+logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
 
 
 # Application configuration
@@ -55,7 +68,10 @@ class Config:
 
     # File limits
     MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+    UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB
+    MULTIPART_OVERHEAD = 64 * 1024  # boundaries and part headers around the file
     ALLOWED_IMAGE_TYPES = {"image/jpeg", "image/png", "image/webp"}
+    ALLOWED_IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp"}
     ALLOWED_FONT_TYPES = {
         "font/ttf",
         "font/otf",
@@ -65,14 +81,21 @@ class Config:
 
     # API settings
     API_PREFIX = "/api/v1"
-    CORS_ORIGINS = [
-        "https://pinmaker.netlify.app",  # Main frontend domain
-        "http://localhost:3000",
-        "https://*.netlify.app",  # Allow Netlify preview deployments
-        "https://pinmaker-frontend.netlify.app",  # Your Netlify domain
-        "https://krafty-sprouts-media-llc.netlify.app",  # Organization domain
-        "*",  # Allow all origins temporarily for debugging
-    ]
+    CORS_ORIGINS = frozenset(
+        {
+            "https://pinmaker.netlify.app",  # Main frontend domain
+            "http://localhost:3000",
+            "https://pinmaker-frontend.netlify.app",  # Your Netlify domain
+            "https://krafty-sprouts-media-llc.netlify.app",  # Organization domain
+            "*",  # Allow all origins temporarily for debugging
+        }
+    )
+    # Netlify preview deployments (CORSMiddleware does not expand "*." entries)
+    CORS_ORIGIN_REGEX = r"https://[a-z0-9-]+\.netlify\.app"
+
+    # Temporary file cleanup
+    CLEANUP_INTERVAL = 600  # seconds between sweeps
+    FILE_MAX_AGE = 3600  # delete generated files older than 1 hour
 
     # Stock photo API keys (from environment)
     UNSPLASH_ACCESS_KEY = os.getenv("UNSPLASH_ACCESS_KEY")
@@ -92,6 +115,15 @@ for directory in [
 ]:
     directory.mkdir(parents=True, exist_ok=True)
 
+# Cap concurrent model inferences per worker; slots are held until the
+# analysis thread finishes, even when the request has already timed out
+ANALYZE_CONCURRENCY = 2
+ANALYZE_TIMEOUT = 30.0  # seconds (reduced from 60)
+
+# Dedicated pool for image analysis; the default executor stays free for
+# aiofiles/to_thread I/O (uploads, font registration, cleanup)
+analysis_runner: Optional[AnalysisRunner] = None
+
 # Global service instances
 image_analyzer: Optional[ImageAnalyzer] = None
 template_generator: Optional[TemplateGenerator] = None
@@ -100,6 +132,40 @@ stock_photo_service: Optional[StockPhotoService] = None
 font_manager: Optional[FontManager] = None
 
 
+def prewarm_image_decoders() -> None:
+    """Run a tiny JPEG round trip so codec setup doesn't land on the first upload."""
+    buffer = io.BytesIO()
+    Image.new("RGB", (16, 16)).save(buffer, "JPEG")
+    buffer.seek(0)
+    with Image.open(buffer) as image:
+        image.convert("RGB").quantize(colors=5, method=Image.Quantize.FASTOCTREE)
+
+
+def sweep_old_files() -> None:
+    """Delete temporary files older than FILE_MAX_AGE."""
+    cutoff = time.time() - config.FILE_MAX_AGE
+    for directory in [config.UPLOAD_DIR, config.TEMPLATE_DIR, config.PREVIEW_DIR]:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_file() and entry.stat().st_mtime < cutoff:
+                        os.unlink(entry.path)
+                        logger.info("Cleaned up old file: %s", entry.path)
+                except FileNotFoundError:
+                    # Another worker swept it first
+                    pass
+
+
+async def cleanup_loop() -> None:
+    """Run the temporary file sweep in the background for the app's lifetime."""
+    while True:
+        await asyncio.sleep(config.CLEANUP_INTERVAL)
+        try:
+            await asyncio.to_thread(sweep_old_files)
+        except Exception as e:
+            logger.error("Error during cleanup: %s", e)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager for startup and shutdown events."""
@@ -107,11 +173,19 @@ async def lifespan(app: FastAPI):
     logger.info("Starting Pinterest Template Generator...")
 
     global image_analyzer, template_generator, preview_generator, stock_photo_service, font_manager
+    global analysis_runner
+
+    analysis_runner = AnalysisRunner(ANALYZE_CONCURRENCY, ANALYZE_TIMEOUT)
 
     try:
         # Initialize services
         logger.info("Initializing AI services...")
         image_analyzer = ImageAnalyzer()
+        prewarm_image_decoders()
+        if not features.check_feature("libjpeg_turbo"):
+            logger.warning(
+                "Pillow is not built against libjpeg-turbo; JPEG decode/encode will be slower"
+            )
         template_generator = TemplateGenerator()
 
         stock_photo_service = StockPhotoService(
@@ -125,12 +199,29 @@ async def lifespan(app: FastAPI):
 
         # Test API connections
         logger.info("Testing stock photo API connections...")
-        await stock_photo_service.test_apis()
+        await asyncio.to_thread(stock_photo_service.test_apis)
+
+        # Service references are fixed from here on, so serialize health once
+        app.state.health_body = orjson.dumps(
+            {
+                "status": "healthy",
+                "services": {
+                    "image_analyzer": image_analyzer is not None,
+                    "template_generator": template_generator is not None,
+                    "preview_generator": preview_generator is not None,
+                    "stock_photo_service": stock_photo_service is not None,
+                    "font_manager": font_manager is not None,
+                },
+            }
+        )
+
+        # Sweep expired uploads/templates/previews periodically, not at shutdown
+        app.state.cleanup_task = asyncio.create_task(cleanup_loop())
 
         logger.info("Application startup complete")
 
     except Exception as e:
-        logger.error(f"Failed to initialize services: {e}")
+        logger.error("Failed to initialize services: %s", e)
         raise
 
     yield
@@ -138,22 +229,14 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("Shutting down Pinterest Template Generator...")
 
-    # Cleanup temporary files older than 1 hour
-    try:
-        import time
-
-        current_time = time.time()
-        for directory in [config.UPLOAD_DIR, config.TEMPLATE_DIR, config.PREVIEW_DIR]:
-            for file_path in directory.glob("*"):
-                if (
-                    file_path.is_file()
-                    and (current_time - file_path.stat().st_mtime) > 3600
-                ):
-                    file_path.unlink()
-                    logger.info(f"Cleaned up old file: {file_path}")
-    except Exception as e:
-        logger.error(f"Error during cleanup: {e}")
+    app.state.cleanup_task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await app.state.cleanup_task
+
+    if font_manager is not None:
+        font_manager.flush()
 
+    analysis_runner.shutdown()
     logger.info("Application shutdown complete")
 
 
@@ -163,20 +246,36 @@ app = FastAPI(
     description="AI-powered Pinterest template generation from images",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     docs_url="/api/docs",
     redoc_url="/api/redoc",
 )
 
+UPLOAD_PATHS = frozenset(
+    {f"{config.API_PREFIX}/analyze", f"{config.API_PREFIX}/fonts/upload"}
+)
+
+
+# Registered before CORSMiddleware so 413s still carry CORS headers
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    paths=UPLOAD_PATHS,
+    max_body_size=config.MAX_FILE_SIZE + config.MULTIPART_OVERHEAD,
+)
+
+
 # Add middleware
 app.add_middleware(
     CORSMiddleware,
     allow_origins=config.CORS_ORIGINS,
+    allow_origin_regex=config.CORS_ORIGIN_REGEX,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+# Response compression is done by Caddy (encode zstd gzip), off the worker
+
 # Temporarily disable TrustedHostMiddleware to resolve "Invalid host header" issue
 # app.add_middleware(
 #     TrustedHostMiddleware,
@@ -234,26 +333,76 @@ class PreviewResponse(BaseModel):
     message: str = ""
 
 
+def is_supported_image(header: bytes) -> bool:
+    """Check the leading bytes of an upload against JPEG/PNG/WebP signatures."""
+    return (
+        header.startswith(b"\xff\xd8\xff")
+        or header.startswith(b"\x89PNG\r\n\x1a\n")
+        or (header[:4] == b"RIFF" and header[8:12] == b"WEBP")
+    )
+
+
+@lru_cache(maxsize=256)
+def _load_analysis(path: str, mtime_ns: int) -> dict:
+    """Parse an analysis JSON file; mtime_ns in the key invalidates rewrites."""
+    with open(path, "rb") as f:
+        return orjson.loads(f.read())
+
+
+@lru_cache(maxsize=256)
+def _load_svg(path: str, mtime_ns: int) -> str:
+    """Read an SVG template; mtime_ns in the key invalidates rewrites."""
+    with open(path, "r") as f:
+        return f.read()
+
+
+async def save_upload(
+    file: UploadFile, path: Path, prefix: bytes = b"", exclusive: bool = False
+) -> int:
+    """Stream an upload to disk without blocking the loop, enforcing MAX_FILE_SIZE.
+
+    With exclusive=True the file must not exist yet (FileExistsError otherwise).
+    """
+    size = len(prefix)
+    async with aiofiles.open(path, "xb" if exclusive else "wb") as f:
+        if prefix:
+            await f.write(prefix)
+        while chunk := await file.read(config.UPLOAD_CHUNK_SIZE):
+            size += len(chunk)
+            if size > config.MAX_FILE_SIZE:
+                raise HTTPException(status_code=413, detail="File too large")
+            await f.write(chunk)
+    return size
+
+
+@app.exception_handler(Exception)
+async def unhandled_exception_handler(request: Request, exc: Exception):
+    """Log unexpected errors once and return a generic 500 without internals."""
+    logger.exception("Unhandled error on %s %s", request.method, request.url.path)
+    # This response bypasses CORSMiddleware; add the header so browsers can read it
+    headers = {}
+    origin = request.headers.get("origin")
+    if origin and (
+        "*" in config.CORS_ORIGINS
+        or origin in config.CORS_ORIGINS
+        or re.fullmatch(config.CORS_ORIGIN_REGEX, origin)
+    ):
+        headers = {"Access-Control-Allow-Origin": origin, "Vary": "Origin"}
+    return ORJSONResponse(
+        {"detail": "Internal server error"}, status_code=500, headers=headers
+    )
+
+
 # API Routes
 @app.get(f"{config.API_PREFIX}/health")
-async def health_check():
+async def health_check(request: Request):
     """Health check endpoint."""
-    return {
-        "status": "healthy",
-        "services": {
-            "image_analyzer": image_analyzer is not None,
-            "template_generator": template_generator is not None,
-            "preview_generator": preview_generator is not None,
-            "stock_photo_service": stock_photo_service is not None,
-            "font_manager": font_manager is not None,
-        },
-    }
+    return Response(request.app.state.health_body, media_type="application/json")
 
 
 @app.options(f"{config.API_PREFIX}/analyze")
 async def analyze_options():
     """Handle CORS preflight requests for analyze endpoint."""
-    from fastapi.responses import Response
     return Response(
         status_code=200,
         headers={
@@ -268,284 +417,244 @@ async def analyze_options():
 @app.post(f"{config.API_PREFIX}/analyze", response_model=AnalysisResponse)
 async def analyze_image(file: UploadFile = File(...)):
     """Analyze uploaded image and extract design elements."""
+    # Validate file
+    if file.content_type not in config.ALLOWED_IMAGE_TYPES:
+        raise HTTPException(status_code=400, detail="Invalid file type")
+
+    # content_type is client-supplied; check the extension we store under too
+    ext = os.path.splitext(file.filename or "")[1].lower()
+    if ext not in config.ALLOWED_IMAGE_EXTENSIONS:
+        raise HTTPException(status_code=400, detail="Invalid file extension")
+
+    # Cheap early reject when the declared size is already too large. This only
+    # trusts Content-Length/part size; chunked or lying clients are caught by
+    # save_upload's streamed 413, so keep that check
+    if file.size is not None and file.size > config.MAX_FILE_SIZE:
+        raise HTTPException(status_code=413, detail="File too large")
+
+    # Sniff the file signature before streaming the rest of the upload
+    header = await file.read(12)
+    if not is_supported_image(header):
+        raise HTTPException(status_code=400, detail="Invalid image file")
+
+    # Generate unique filename
+    analysis_id = uuid.uuid4().hex
+    file_path = config.UPLOAD_DIR / f"{analysis_id}{ext}"
+
+    # Ensure upload directory exists and is writable
+    config.UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+
+    # Stream upload to disk in chunks instead of buffering it in memory
     try:
-        # Validate file
-        if file.content_type not in config.ALLOWED_IMAGE_TYPES:
-            raise HTTPException(status_code=400, detail="Invalid file type")
-
-        # Read and save file
-        content = await file.read()
-        if len(content) > config.MAX_FILE_SIZE:
-            raise HTTPException(status_code=400, detail="File too large")
-
-        # Generate unique filename
-        import uuid
-
-        analysis_id = str(uuid.uuid4())
-        file_path = config.UPLOAD_DIR / f"{analysis_id}.{file.filename.split('.')[-1]}"
+        await save_upload(file, file_path, prefix=header)
+    except HTTPException:
+        file_path.unlink(missing_ok=True)
+        raise
 
-        # Ensure upload directory exists and is writable
-        config.UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+    # Analyze image with enhanced error handling
+    logger.info("Starting analysis for image: %s", file_path)
+    try:
+        # Check if image analyzer is available
+        if image_analyzer is None:
+            logger.error("Image analyzer not initialized")
+            raise HTTPException(status_code=500, detail="Image analysis service not available")
         
-        with open(file_path, "wb") as f:
-            f.write(content)
-
-        # Analyze image with enhanced error handling
-        logger.info(f"Starting analysis for image: {file_path}")
-        try:
-            # Check if image analyzer is available
-            if image_analyzer is None:
-                logger.error("Image analyzer not initialized")
-                raise HTTPException(status_code=500, detail="Image analysis service not available")
-            
-            # Test basic dependencies first
-            try:
-                import cv2
-                import numpy as np
-                logger.info("OpenCV and NumPy available")
-            except ImportError as e:
-                logger.error(f"Missing basic dependencies: {e}")
-                raise HTTPException(status_code=500, detail=f"Missing basic image processing libraries: {e}")
-            
-            # Perform analysis with timeout
-            import asyncio
-            analysis_result = await asyncio.wait_for(
-                asyncio.to_thread(image_analyzer.analyze_image, str(file_path)),
-                timeout=30.0  # 30 second timeout (reduced from 60)
-            )
-            
-            logger.info(f"Analysis completed successfully for: {analysis_id}")
-            
-            # Save analysis results for later use
-            analysis_file = config.UPLOAD_DIR / f"{analysis_id}.json"
-            import json
-            with open(analysis_file, "w") as f:
-                json.dump(analysis_result, f)
-            
-            # Return response with explicit CORS headers
-            from fastapi.responses import JSONResponse
-            return JSONResponse(
-                content={
-                    "success": True,
-                    "analysis_id": analysis_id,
-                    **analysis_result
-                },
-                headers={
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Methods": "POST, OPTIONS",
-                    "Access-Control-Allow-Headers": "*",
-                }
-            )
-        except asyncio.TimeoutError:
-            logger.error(f"Analysis timeout for {analysis_id}")
-            raise HTTPException(
-                status_code=504, 
-                detail="Image analysis timed out. Please try with a smaller image."
+        # Perform analysis with timeout
+        analysis_result = await analysis_runner.run(
+            image_analyzer.analyze_image, str(file_path)
+        )
+        
+        logger.info("Analysis completed successfully for: %s", analysis_id)
+        
+        # Save analysis results for later use
+        analysis_file = config.UPLOAD_DIR / f"{analysis_id}.json"
+        async with aiofiles.open(analysis_file, "wb") as f:
+            # OCR/OpenCV results may still carry numpy scalars
+            await f.write(
+                orjson.dumps(analysis_result, option=orjson.OPT_SERIALIZE_NUMPY)
             )
-        except Exception as analysis_error:
-            logger.error(f"Image analysis failed for {analysis_id}: {analysis_error}")
-            logger.error(f"Error type: {type(analysis_error).__name__}")
-            logger.error(f"Error details: {str(analysis_error)}")
-            
-            # Clean up the uploaded file if analysis fails
-            try:
-                if file_path.exists():
-                    file_path.unlink()
-            except Exception as cleanup_error:
-                logger.error(f"Failed to cleanup file {file_path}: {cleanup_error}")
-            
-            # Provide more specific error messages
-            error_msg = str(analysis_error)
-            if "CUDA" in error_msg or "GPU" in error_msg:
-                error_msg = "GPU memory error. Please try with a smaller image."
-            elif "memory" in error_msg.lower():
-                error_msg = "Server memory limit exceeded. Please try with a smaller image."
-            elif "model" in error_msg.lower() or "yolo" in error_msg.lower():
-                error_msg = "AI model loading error. Please try again in a few moments."
-            elif "easyocr" in error_msg.lower():
-                error_msg = "Text recognition service error. Please try again."
-            elif "colorthief" in error_msg.lower():
-                error_msg = "Color analysis error. Please try again."
-            else:
-                error_msg = f"Image analysis failed: {error_msg}"
-            
-            raise HTTPException(status_code=500, detail=error_msg)
-
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Unexpected error in analyze endpoint: {e}")
-        logger.error(f"Error type: {type(e).__name__}")
-        import traceback
-        logger.error(f"Traceback: {traceback.format_exc()}")
-        raise HTTPException(status_code=500, detail="Internal server error during image upload")
+        
+        # Return response with explicit CORS headers
+        return ORJSONResponse(
+            content={
+                "success": True,
+                "analysis_id": analysis_id,
+                **analysis_result
+            },
+            headers={
+                "Access-Control-Allow-Origin": "*",
+                "Access-Control-Allow-Methods": "POST, OPTIONS",
+                "Access-Control-Allow-Headers": "*",
+            }
+        )
+    except ValueError as invalid_image:
+        # Unreadable or oversized image, rejected before any pixels were decoded
+        file_path.unlink(missing_ok=True)
+        raise HTTPException(status_code=400, detail=str(invalid_image))
+    except asyncio.TimeoutError:
+        logger.error("Analysis timeout for %s", analysis_id)
+        raise HTTPException(
+            status_code=504, 
+            detail="Image analysis timed out. Please try with a smaller image."
+        )
+    except Exception as analysis_error:
+        logger.error("Image analysis failed for %s: %s", analysis_id, analysis_error)
+        logger.error("Error type: %s", type(analysis_error).__name__)
+        logger.error("Error details: %s", analysis_error)
+        
+        # Clean up the uploaded file if analysis fails
+        try:
+            if file_path.exists():
+                file_path.unlink()
+        except Exception as cleanup_error:
+            logger.error("Failed to cleanup file %s: %s", file_path, cleanup_error)
+        
+        # Provide more specific error messages
+        error_msg = str(analysis_error)
+        if "CUDA" in error_msg or "GPU" in error_msg:
+            error_msg = "GPU memory error. Please try with a smaller image."
+        elif "memory" in error_msg.lower():
+            error_msg = "Server memory limit exceeded. Please try with a smaller image."
+        elif "model" in error_msg.lower() or "yolo" in error_msg.lower():
+            error_msg = "AI model loading error. Please try again in a few moments."
+        elif "easyocr" in error_msg.lower():
+            error_msg = "Text recognition service error. Please try again."
+        elif "colorthief" in error_msg.lower():
+            error_msg = "Color analysis error. Please try again."
+        else:
+            error_msg = f"Image analysis failed: {error_msg}"
+        
+        raise HTTPException(status_code=500, detail=error_msg)
 
 
 @app.post(f"{config.API_PREFIX}/generate-template", response_model=TemplateResponse)
 async def generate_template(request: TemplateRequest):
     """Generate SVG template from analysis results."""
-    try:
-        # Load analysis results
-        analysis_file = config.UPLOAD_DIR / f"{request.analysis_id}.json"
-        if not analysis_file.exists():
-            raise HTTPException(status_code=404, detail="Analysis not found")
-
-        import json
-
-        with open(analysis_file, "r") as f:
-            analysis_data = json.load(f)
-
-        # Generate template
-        logger.info(f"Generating template for analysis: {request.analysis_id}")
-        template_result = await asyncio.to_thread(
-            template_generator.create_template,
-            analysis_data,
-            request.style,
-            request.color_scheme,
-        )
-
-        # Save template
-        import uuid
-
-        template_id = str(uuid.uuid4())
-        template_path = config.TEMPLATE_DIR / f"{template_id}.svg"
+    # Load analysis results
+    analysis_file = config.UPLOAD_DIR / f"{request.analysis_id}.json"
+    if not analysis_file.exists():
+        raise HTTPException(status_code=404, detail="Analysis not found")
+
+    analysis_data = _load_analysis(str(analysis_file), analysis_file.stat().st_mtime_ns)
+
+    # Generate template
+    logger.info("Generating template for analysis: %s", request.analysis_id)
+    # create_template(analysis, style, dimensions): color_scheme is not a
+    # generator option and must not be passed positionally as dimensions
+    template_result = await asyncio.to_thread(
+        template_generator.create_template, analysis_data, request.style
+    )
 
-        with open(template_path, "w") as f:
-            f.write(template_result["svg_content"])
+    # Save template
+    template_id = uuid.uuid4().hex
+    template_path = config.TEMPLATE_DIR / f"{template_id}.svg"
 
-        return TemplateResponse(
-            success=True, template_id=template_id, **template_result
-        )
+    async with aiofiles.open(template_path, "w") as f:
+        await f.write(template_result["svg_content"])
 
-    except Exception as e:
-        logger.error(f"Error generating template: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    return TemplateResponse(success=True, template_id=template_id, **template_result)
 
 
 @app.post(f"{config.API_PREFIX}/generate-preview", response_model=PreviewResponse)
 async def generate_preview(request: PreviewRequest):
     """Generate preview image from template."""
-    try:
-        # Load template
-        template_path = config.TEMPLATE_DIR / f"{request.template_id}.svg"
-        if not template_path.exists():
-            raise HTTPException(status_code=404, detail="Template not found")
-
-        with open(template_path, "r") as f:
-            svg_content = f.read()
-
-        # Generate preview
-        logger.info(f"Generating preview for template: {request.template_id}")
-        preview_result = await asyncio.to_thread(
-            preview_generator.generate_preview,
-            svg_content,
-            request.sample_text,
-            request.stock_keywords,
-            request.style,
-            request.format,
-            request.quality,
-        )
-
-        # Save preview
-        import uuid
+    # Load template
+    template_path = config.TEMPLATE_DIR / f"{request.template_id}.svg"
+    if not template_path.exists():
+        raise HTTPException(status_code=404, detail="Template not found")
 
-        preview_id = str(uuid.uuid4())
-        preview_path = config.PREVIEW_DIR / f"{preview_id}.{request.format}"
+    svg_content = _load_svg(str(template_path), template_path.stat().st_mtime_ns)
+
+    # Generate preview
+    logger.info("Generating preview for template: %s", request.template_id)
+    preview_result = await asyncio.to_thread(
+        preview_generator.generate_preview,
+        svg_content,
+        request.sample_text,
+        request.stock_keywords,
+        request.style,
+        request.format,
+        request.quality,
+    )
 
-        with open(preview_path, "wb") as f:
-            f.write(preview_result["image_data"])
+    # Save preview
+    preview_id = uuid.uuid4().hex
+    preview_path = config.PREVIEW_DIR / f"{preview_id}.{request.format}"
 
-        preview_url = f"/previews/{preview_id}.{request.format}"
+    async with aiofiles.open(preview_path, "wb") as f:
+        await f.write(preview_result["image_data"])
 
-        return PreviewResponse(
-            success=True, preview_id=preview_id, preview_url=preview_url
-        )
+    preview_url = f"/previews/{preview_id}.{request.format}"
 
-    except Exception as e:
-        logger.error(f"Error generating preview: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    return PreviewResponse(success=True, preview_id=preview_id, preview_url=preview_url)
 
 
 # Font management endpoints
 @app.post(f"{config.API_PREFIX}/fonts/upload")
 async def upload_font(file: UploadFile = File(...)):
     """Upload custom font file."""
-    try:
-        if file.content_type not in config.ALLOWED_FONT_TYPES:
-            raise HTTPException(status_code=400, detail="Invalid font file type")
+    if file.content_type not in config.ALLOWED_FONT_TYPES:
+        raise HTTPException(status_code=400, detail="Invalid font file type")
 
-        content = await file.read()
-        if len(content) > config.MAX_FILE_SIZE:
-            raise HTTPException(status_code=400, detail="Font file too large")
+    if file.size is not None and file.size > config.MAX_FILE_SIZE:
+        raise HTTPException(status_code=413, detail="Font file too large")
 
-        result = await asyncio.to_thread(
-            font_manager.register_font, file.filename, content
-        )
-        return {"success": True, **result}
+    # Only a bare font file name may land in the font directory; this also
+    # keeps font_registry.json and the directory itself out of reach
+    font_name = Path(file.filename or "").name
+    if Path(font_name).suffix.lower() not in SUPPORTED_FORMATS:
+        raise HTTPException(status_code=400, detail="Unsupported font format")
 
-    except Exception as e:
-        logger.error(f"Error uploading font: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    # Stream straight into the font directory, then register from disk.
+    # Exclusive create: never replace a font that is already installed
+    font_path = config.FONT_DIR / font_name
+    try:
+        await save_upload(file, font_path, exclusive=True)
+    except FileExistsError:
+        raise HTTPException(status_code=409, detail="A font with this name already exists")
+    except HTTPException:
+        font_path.unlink(missing_ok=True)
+        raise
+
+    try:
+        result = await asyncio.to_thread(font_manager.register_font, str(font_path))
+    except ValueError as e:
+        # Unsupported or unreadable font; don't leave it in the font directory
+        font_path.unlink(missing_ok=True)
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"success": True, **result}
 
 
 @app.get(f"{config.API_PREFIX}/fonts")
 async def list_fonts():
     """List available fonts."""
-    try:
-        fonts = await asyncio.to_thread(font_manager.list_fonts)
-        return {"success": True, "fonts": fonts}
-    except Exception as e:
-        logger.error(f"Error listing fonts: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
-
-
-# File serving endpoints
-@app.get("/uploads/{filename}")
-async def serve_upload(filename: str):
-    """Serve uploaded files."""
-    file_path = config.UPLOAD_DIR / filename
-    if not file_path.exists():
-        raise HTTPException(status_code=404, detail="File not found")
-    return FileResponse(file_path)
-
-
-@app.get("/templates/{filename}")
-async def serve_template(filename: str):
-    """Serve template files."""
-    file_path = config.TEMPLATE_DIR / filename
-    if not file_path.exists():
-        raise HTTPException(status_code=404, detail="Template not found")
-    return FileResponse(file_path, media_type="image/svg+xml")
-
-
-@app.get("/previews/{filename}")
-async def serve_preview(filename: str):
-    """Serve preview files."""
-    file_path = config.PREVIEW_DIR / filename
-    if not file_path.exists():
-        raise HTTPException(status_code=404, detail="Preview not found")
-    return FileResponse(file_path)
+    fonts = await asyncio.to_thread(font_manager.list_fonts)
+    return {"success": True, "fonts": fonts}
 
 
-@app.get("/fonts/{filename}")
-async def serve_font(filename: str):
-    """Serve font files."""
-    file_path = config.FONT_DIR / filename
-    if not file_path.exists():
-        raise HTTPException(status_code=404, detail="Font not found")
-    return FileResponse(file_path)
+# File serving endpoints - StaticFiles handles traversal checks,
+# ETag/Last-Modified and zero-copy sendfile
+app.mount("/uploads", StaticFiles(directory=config.UPLOAD_DIR), name="uploads")
+app.mount("/templates", StaticFiles(directory=config.TEMPLATE_DIR), name="templates")
+app.mount("/previews", StaticFiles(directory=config.PREVIEW_DIR), name="previews")
+app.mount("/fonts", StaticFiles(directory=config.FONT_DIR), name="fonts")
 
 
 # API-only backend - frontend served by Netlify
-@app.get("/")
-async def root():
-    """API root endpoint."""
-    return {
+ROOT_BODY = orjson.dumps(
+    {
         "message": "Pinterest Template Generator API",
         "version": "1.0.0",
         "docs": "/api/docs",
         "frontend": "https://pinmaker.netlify.app",  # Correct Netlify URL
     }
+)
+
+
+@app.get("/")
+async def root():
+    """API root endpoint."""
+    return Response(ROOT_BODY, media_type="application/json")
 
 
 
@@ -555,12 +664,17 @@ async def root():
 
 
 if __name__ == "__main__":
-    # Development server
+    # Development server by default; PINMAKER_RELOAD=0 runs multi-worker
+    # (reload and workers are mutually exclusive; uvloop is not available on Windows)
+    reload = os.getenv("PINMAKER_RELOAD", "1") == "1"
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=8000,
-        reload=True,
+        reload=reload,
+        workers=None if reload else int(os.getenv("PINMAKER_WORKERS", os.cpu_count() or 1)),
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
         log_level="info",
-        access_log=True,
+        access_log=bool(os.getenv("PINMAKER_ACCESSLOG")),
     )
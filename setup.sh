@@ -181,6 +181,7 @@ Type=exec
 User=$APP_USER
 Group=$APP_USER
 WorkingDirectory=$APP_DIR
+RuntimeDirectory=$APP_NAME
 Environment=PATH=$APP_DIR/venv/bin
 ExecStart=$APP_DIR/venv/bin/gunicorn -c $APP_DIR/gunicorn.conf.py main:app
 ExecReload=/bin/kill -s HUP \$MAINPID
@@ -241,7 +242,7 @@ fi
 # Test application
 log "Testing application..."
 sleep 5
-if curl -f http://localhost:8000/health >/dev/null 2>&1; then
+if curl -f --unix-socket /run/pinmaker/gunicorn.sock http://localhost/health >/dev/null 2>&1; then
     log "✅ Application health check passed"
 else
     warn "⚠️ Application health check failed - check logs"
@@ -0,0 +1,51 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+
+class AnalysisRunner:
+    """Run blocking analyses on a dedicated thread pool with bounded concurrency.
+
+    A slot stays taken until its worker thread finishes, even when the caller
+    timed out or was cancelled: the thread cannot be stopped, so releasing on
+    exit would let more analyses run than the limit allows.
+    """
+
+    def __init__(self, max_concurrent: int, timeout: float):
+        self.timeout = timeout
+        # Number of analyses whose worker thread has not finished yet
+        self.active = 0
+        self._slots = asyncio.Semaphore(max_concurrent)
+        # One thread per slot; PIL/OpenCV/torch already use several native
+        # threads per call
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrent, thread_name_prefix="pinmaker-cpu"
+        )
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run func(*args) in the pool, raising asyncio.TimeoutError after timeout"""
+        await self._slots.acquire()
+        try:
+            future = asyncio.get_running_loop().run_in_executor(
+                self._executor, func, *args
+            )
+        except BaseException:
+            self._slots.release()
+            raise
+        self.active += 1
+        future.add_done_callback(self._release)
+        # shield: a timeout or cancellation must not cancel the future, which
+        # would fire the done callback (and free the slot) while the thread runs
+        return await asyncio.wait_for(asyncio.shield(future), timeout=self.timeout)
+
+    def _release(self, future: asyncio.Future) -> None:
+        """Free the slot once the worker thread is really done"""
+        self.active -= 1
+        self._slots.release()
+        if not future.cancelled():
+            # Mark the result retrieved; an abandoned caller no longer awaits it
+            future.exception()
+
+    def shutdown(self) -> None:
+        """Stop accepting work and drop queued analyses"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
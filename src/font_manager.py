@@ -1,12 +1,111 @@
 import os
+import re
 import shutil
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Any, Optional
-import json
+import orjson
 from datetime import datetime
 from fontTools.ttLib import TTFont
 from fontTools.ttLib.tables._n_a_m_e import NameRecord
 import base64
+from functools import lru_cache
+
+
+# Supported font formats
+SUPPORTED_FORMATS = [".ttf", ".otf", ".woff", ".woff2"]
+
+# Default web-safe fonts
+WEB_SAFE_FONTS = {
+    "Arial": {"family": "Arial", "type": "sans-serif", "web_safe": True},
+    "Helvetica": {
+        "family": "Helvetica",
+        "type": "sans-serif",
+        "web_safe": True,
+    },
+    "Times New Roman": {
+        "family": "Times New Roman",
+        "type": "serif",
+        "web_safe": True,
+    },
+    "Georgia": {"family": "Georgia", "type": "serif", "web_safe": True},
+    "Courier New": {
+        "family": "Courier New",
+        "type": "monospace",
+        "web_safe": True,
+    },
+    "Verdana": {"family": "Verdana", "type": "sans-serif", "web_safe": True},
+    "Trebuchet MS": {
+        "family": "Trebuchet MS",
+        "type": "sans-serif",
+        "web_safe": True,
+    },
+    "Impact": {"family": "Impact", "type": "sans-serif", "web_safe": True},
+}
+
+# list_fonts() entries for the web-safe fonts, built once at import
+_WEB_SAFE_FONT_ENTRIES = [
+    {
+        "id": f"web_safe_{font_name.lower().replace(' ', '_')}",
+        "family_name": font_name,
+        "style_name": "Regular",
+        "full_name": font_name,
+        "type": font_info["type"],
+        "weight": "400",
+        "italic": False,
+        "web_safe": True,
+        "format": "system",
+    }
+    for font_name, font_info in WEB_SAFE_FONTS.items()
+]
+
+
+# Font type keywords, checked in priority order (monospace > serif > cursive)
+_FONT_TYPE_RULES = [
+    (("mono", "courier", "console", "code"), "monospace"),
+    (("times", "georgia", "serif", "garamond"), "serif"),
+    (("script", "brush", "hand", "cursive"), "cursive"),
+]
+
+# Weight keywords in the precedence order of the original if/elif chain; a
+# compound keyword ranks as the first rule it contains ("extrabold" -> "bold")
+_WEIGHT_RULES = [
+    (("thin", "hairline"), "100"),
+    (("extralight", "ultralight"), "200"),
+    (("light",), "300"),
+    (("medium",), "500"),
+    (("semibold", "demibold"), "600"),
+    (("bold",), "700"),
+    (("extrabold", "ultrabold"), "800"),
+    (("black", "heavy"), "900"),
+]
+
+
+def _compile_rules(rules):
+    """Build one alternation regex plus keyword -> rule-index lookup"""
+    keywords = [keyword for words, _ in rules for keyword in words]
+    rank = {
+        keyword: min(
+            i for i, (words, _) in enumerate(rules) if any(w in keyword for w in words)
+        )
+        for keyword in keywords
+    }
+    # Longest first so compound keywords match whole
+    pattern = re.compile("|".join(sorted(keywords, key=len, reverse=True)))
+    return pattern, rank
+
+
+_FONT_TYPE_RE, _FONT_TYPE_RANK = _compile_rules(_FONT_TYPE_RULES)
+_WEIGHT_RE, _WEIGHT_RANK = _compile_rules(_WEIGHT_RULES)
+
+
+@lru_cache(maxsize=16)
+def _encode_font_file(path: str, mtime_ns: int, size: int) -> str:
+    """Base64-encode a font file; mtime/size in the key invalidate rewrites"""
+    with open(path, "rb") as f:
+        return base64.b64encode(f.read()).decode("ascii")
 
 
 class FontManager:
@@ -16,115 +115,170 @@ class FontManager:
 
         self.font_registry_file = self.fonts_dir / "font_registry.json"
         self.font_registry = self._load_font_registry()
+        # Set when font_registry differs from the file on disk
+        self._dirty = False
+        # Serializes registry mutations and saves across executor threads
+        self._registry_lock = threading.Lock()
+
+        # Cached result of list_fonts()
+        self._fonts_cache: Optional[List[Dict[str, Any]]] = None
 
         # Supported font formats
-        self.supported_formats = [".ttf", ".otf", ".woff", ".woff2"]
+        self.supported_formats = SUPPORTED_FORMATS
 
         # Default web-safe fonts
-        self.web_safe_fonts = {
-            "Arial": {"family": "Arial", "type": "sans-serif", "web_safe": True},
-            "Helvetica": {
-                "family": "Helvetica",
-                "type": "sans-serif",
-                "web_safe": True,
-            },
-            "Times New Roman": {
-                "family": "Times New Roman",
-                "type": "serif",
-                "web_safe": True,
-            },
-            "Georgia": {"family": "Georgia", "type": "serif", "web_safe": True},
-            "Courier New": {
-                "family": "Courier New",
-                "type": "monospace",
-                "web_safe": True,
-            },
-            "Verdana": {"family": "Verdana", "type": "sans-serif", "web_safe": True},
-            "Trebuchet MS": {
-                "family": "Trebuchet MS",
-                "type": "sans-serif",
-                "web_safe": True,
-            },
-            "Impact": {"family": "Impact", "type": "sans-serif", "web_safe": True},
-        }
+        self.web_safe_fonts = WEB_SAFE_FONTS
 
     def _load_font_registry(self) -> Dict[str, Any]:
         """Load font registry from file"""
         try:
             if self.font_registry_file.exists():
-                with open(self.font_registry_file, "r", encoding="utf-8") as f:
-                    return json.load(f)
+                with open(self.font_registry_file, "rb") as f:
+                    return orjson.loads(f.read())
             return {}
         except Exception as e:
             print(f"Error loading font registry: {e}")
             return {}
 
     def _save_font_registry(self):
-        """Save font registry to file"""
+        """Save font registry to file if it changed, replacing it atomically"""
+        if not self._dirty:
+            return
         try:
-            with open(self.font_registry_file, "w", encoding="utf-8") as f:
-                json.dump(self.font_registry, f, indent=2, ensure_ascii=False)
+            tmp_file = self.font_registry_file.with_suffix(".json.tmp")
+            with open(tmp_file, "wb") as f:
+                f.write(orjson.dumps(self.font_registry, option=orjson.OPT_INDENT_2))
+            os.replace(tmp_file, self.font_registry_file)
+            self._dirty = False
         except Exception as e:
             print(f"Error saving font registry: {e}")
 
-    async def register_font(self, font_path: str) -> Dict[str, Any]:
+    def flush(self):
+        """Write any pending registry changes to disk"""
+        with self._registry_lock:
+            self._save_font_registry()
+
+    def register_font(self, font_path: str) -> Dict[str, Any]:
         """Register a new font file and extract metadata"""
         try:
-            font_path = Path(font_path)
-
-            if not font_path.exists():
-                raise FileNotFoundError(f"Font file not found: {font_path}")
-
-            # Validate font format
-            if font_path.suffix.lower() not in self.supported_formats:
-                raise ValueError(f"Unsupported font format: {font_path.suffix}")
-
-            # Extract font metadata
-            font_info = await self._extract_font_info(font_path)
-
-            # Generate unique font ID
-            font_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{font_path.stem}"
-
-            # Store font info in registry
-            self.font_registry[font_id] = {
-                "id": font_id,
-                "filename": font_path.name,
-                "path": str(font_path),
-                "format": font_path.suffix.lower(),
-                "family_name": font_info["family_name"],
-                "style_name": font_info["style_name"],
-                "full_name": font_info["full_name"],
-                "type": font_info["type"],
-                "weight": font_info["weight"],
-                "italic": font_info["italic"],
-                "uploaded_at": datetime.now().isoformat(),
-                "file_size": font_path.stat().st_size,
-                "web_safe": False,
-            }
+            entry = self._build_font_entry(font_path)
 
-            # Save registry
-            self._save_font_registry()
+            # Store font info in registry and save
+            with self._registry_lock:
+                self.font_registry[entry["id"]] = entry
+                self._dirty = True
+                self._save_font_registry()
+                self._fonts_cache = None
 
-            return self.font_registry[font_id]
+            return entry
 
+        except (FileNotFoundError, ValueError):
+            raise
         except Exception as e:
             raise Exception(f"Font registration failed: {str(e)}")
 
-    async def _extract_font_info(self, font_path: Path) -> Dict[str, Any]:
+    def register_fonts(
+        self, font_paths: List[str], max_workers: int = 4
+    ) -> List[Dict[str, Any]]:
+        """Register several font files, parsing in parallel and saving once"""
+        try:
+            # fontTools parsing is mostly file I/O; overlap it across threads
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                entries = list(executor.map(self._build_font_entry, font_paths))
+
+            with self._registry_lock:
+                for entry in entries:
+                    self.font_registry[entry["id"]] = entry
+                self._dirty = True
+                self._save_font_registry()
+                self._fonts_cache = None
+
+            return entries
+
+        except (FileNotFoundError, ValueError):
+            raise
+        except Exception as e:
+            raise Exception(f"Font registration failed: {str(e)}")
+
+    def _build_font_entry(self, font_path: str) -> Dict[str, Any]:
+        """Validate a font file and build its registry entry (no registry writes)"""
+        font_path = Path(font_path)
+
+        if not font_path.exists():
+            raise FileNotFoundError(f"Font file not found: {font_path}")
+
+        # Validate font format
+        if font_path.suffix.lower() not in self.supported_formats:
+            raise ValueError(f"Unsupported font format: {font_path.suffix}")
+
+        # Extract font metadata, reusing a previous parse of the same file version
+        stat = font_path.stat()
+        font_info = self._find_registered_info(
+            str(font_path), stat.st_mtime_ns, stat.st_size
+        )
+        if font_info is None:
+            font_info = self._extract_font_info(font_path)
+
+        # Generate unique font ID; the random suffix keeps same-stem files
+        # registered within the same second (e.g. one batch) apart
+        font_id = (
+            f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{font_path.stem}"
+            f"_{uuid.uuid4().hex[:8]}"
+        )
+
+        return {
+            "id": font_id,
+            "filename": font_path.name,
+            "path": str(font_path),
+            "format": font_path.suffix.lower(),
+            "family_name": font_info["family_name"],
+            "style_name": font_info["style_name"],
+            "full_name": font_info["full_name"],
+            "type": font_info["type"],
+            "weight": font_info["weight"],
+            "italic": font_info["italic"],
+            "uploaded_at": datetime.now().isoformat(),
+            "file_size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "web_safe": False,
+        }
+
+    def _find_registered_info(
+        self, path: str, mtime_ns: int, size: int
+    ) -> Optional[Dict[str, Any]]:
+        """Return a registry entry already parsed from this exact file version"""
+        for info in self.font_registry.values():
+            if (
+                info.get("path") == path
+                and info.get("mtime_ns") == mtime_ns
+                and info.get("file_size") == size
+            ):
+                return info
+        return None
+
+    def _extract_font_info(self, font_path: Path) -> Dict[str, Any]:
         """Extract metadata from font file"""
         try:
             # Only process TTF and OTF files with fontTools
             if font_path.suffix.lower() in [".ttf", ".otf"]:
-                font = TTFont(font_path)
-
-                # Extract name table
-                name_table = font["name"]
+                # Only the name table is read: decompile tables lazily on access.
+                # lazy=True reads from the file until close; owning the handle
+                # also closes it when TTFont rejects the file mid-parse
+                try:
+                    with open(font_path, "rb") as font_file, TTFont(
+                        font_file, lazy=True, recalcBBoxes=False, recalcTimestamp=False
+                    ) as font:
+                        # Extract name table, indexed once by nameID
+                        names = self._index_font_names(font["name"])
+                except Exception as e:
+                    # Never register (and serve) a file fontTools cannot read
+                    raise ValueError(f"Unreadable font file: {font_path.name}") from e
 
                 # Get font names
-                family_name = self._get_font_name(name_table, 1) or font_path.stem
-                style_name = self._get_font_name(name_table, 2) or "Regular"
+                family_name = self._get_font_name(names, 1) or font_path.stem
+                style_name = self._get_font_name(names, 2) or "Regular"
                 full_name = (
-                    self._get_font_name(name_table, 4) or f"{family_name} {style_name}"
+                    self._get_font_name(names, 4) or f"{family_name} {style_name}"
                 )
 
                 # Determine font type
@@ -136,8 +290,6 @@ class FontManager:
                     "italic" in style_name.lower() or "oblique" in style_name.lower()
                 )
 
-                font.close()
-
                 return {
                     "family_name": family_name,
                     "style_name": style_name,
@@ -148,77 +300,51 @@ class FontManager:
                 }
 
             else:
-                # For WOFF/WOFF2, use filename-based extraction
+                # For WOFF/WOFF2, check the container signature, then use
+                # filename-based extraction
+                with open(font_path, "rb") as font_file:
+                    signature = font_file.read(4)
+                if signature not in (b"wOFF", b"wOF2"):
+                    raise ValueError(f"Unreadable font file: {font_path.name}")
                 return self._extract_info_from_filename(font_path)
 
+        except ValueError:
+            raise
         except Exception as e:
             print(f"Error extracting font info: {e}")
             return self._extract_info_from_filename(font_path)
 
-    def _get_font_name(self, name_table, name_id: int) -> Optional[str]:
-        """Extract specific name from font name table"""
+    def _index_font_names(self, name_table) -> Dict[int, NameRecord]:
+        """Map nameID to its first Microsoft (3) or Macintosh (1) platform record"""
+        names = {}
+        for record in name_table.names:
+            if record.platformID in (1, 3):
+                names.setdefault(record.nameID, record)
+        return names
+
+    def _get_font_name(self, names: Dict[int, NameRecord], name_id: int) -> Optional[str]:
+        """Extract specific name from the indexed font name table"""
         try:
-            for record in name_table.names:
-                if record.nameID == name_id:
-                    if record.platformID == 3:  # Microsoft platform
-                        return record.toUnicode()
-                    elif record.platformID == 1:  # Macintosh platform
-                        return record.toUnicode()
-            return None
+            record = names.get(name_id)
+            return record.toUnicode() if record else None
         except Exception:
             return None
 
     def _determine_font_type(self, family_name: str, style_name: str) -> str:
         """Determine font type (serif, sans-serif, monospace, etc.)"""
-        family_lower = family_name.lower()
-        style_lower = style_name.lower()
-
-        # Check for monospace indicators
-        if any(
-            keyword in family_lower
-            for keyword in ["mono", "courier", "console", "code"]
-        ):
-            return "monospace"
-
-        # Check for serif indicators
-        if any(
-            keyword in family_lower
-            for keyword in ["times", "georgia", "serif", "garamond"]
-        ):
-            return "serif"
-
-        # Check for script/decorative indicators
-        if any(
-            keyword in family_lower
-            for keyword in ["script", "brush", "hand", "cursive"]
-        ):
-            return "cursive"
+        ranks = [_FONT_TYPE_RANK[m] for m in _FONT_TYPE_RE.findall(family_name.lower())]
+        if ranks:
+            return _FONT_TYPE_RULES[min(ranks)][1]
 
         # Default to sans-serif
         return "sans-serif"
 
     def _extract_weight(self, style_name: str) -> str:
         """Extract font weight from style name"""
-        style_lower = style_name.lower()
-
-        if "thin" in style_lower or "hairline" in style_lower:
-            return "100"
-        elif "extralight" in style_lower or "ultralight" in style_lower:
-            return "200"
-        elif "light" in style_lower:
-            return "300"
-        elif "medium" in style_lower:
-            return "500"
-        elif "semibold" in style_lower or "demibold" in style_lower:
-            return "600"
-        elif "bold" in style_lower:
-            return "700"
-        elif "extrabold" in style_lower or "ultrabold" in style_lower:
-            return "800"
-        elif "black" in style_lower or "heavy" in style_lower:
-            return "900"
-        else:
-            return "400"  # Normal/Regular
+        ranks = [_WEIGHT_RANK[m] for m in _WEIGHT_RE.findall(style_name.lower())]
+        if ranks:
+            return _WEIGHT_RULES[min(ranks)][1]
+        return "400"  # Normal/Regular
 
     def _extract_info_from_filename(self, font_path: Path) -> Dict[str, Any]:
         """Extract font info from filename when fontTools can't be used"""
@@ -239,45 +365,48 @@ class FontManager:
             "italic": "italic" in style_name.lower(),
         }
 
-    async def list_fonts(self) -> List[Dict[str, Any]]:
+    def list_fonts(self) -> List[Dict[str, Any]]:
         """Get list of all available fonts (web-safe + uploaded)"""
         try:
-            fonts = []
-
-            # Add web-safe fonts
-            for font_name, font_info in self.web_safe_fonts.items():
-                fonts.append(
-                    {
-                        "id": f"web_safe_{font_name.lower().replace(' ', '_')}",
-                        "family_name": font_name,
-                        "style_name": "Regular",
-                        "full_name": font_name,
-                        "type": font_info["type"],
-                        "weight": "400",
-                        "italic": False,
-                        "web_safe": True,
-                        "format": "system",
-                    }
-                )
-
-            # Add uploaded fonts
-            for font_id, font_info in self.font_registry.items():
-                # Check if font file still exists
-                if Path(font_info["path"]).exists():
-                    fonts.append(font_info)
-                else:
-                    # Remove from registry if file doesn't exist
-                    del self.font_registry[font_id]
-
-            # Save updated registry
-            self._save_font_registry()
-
-            return fonts
+            # Serve the cached list; register/delete/refresh invalidate it
+            fonts = self._fonts_cache
+            if fonts is not None:
+                return list(fonts)
+
+            # Build, prune, save and publish under the registry lock so a list
+            # built from an older registry is never cached after a register or
+            # delete has invalidated it
+            with self._registry_lock:
+                if self._fonts_cache is None:
+                    # Add web-safe fonts
+                    fonts = list(_WEB_SAFE_FONT_ENTRIES)
+
+                    # Add uploaded fonts
+                    for font_id, font_info in list(self.font_registry.items()):
+                        # Check if font file still exists
+                        if Path(font_info["path"]).exists():
+                            fonts.append(font_info)
+                        else:
+                            # Remove from registry if file doesn't exist
+                            del self.font_registry[font_id]
+                            self._dirty = True
+
+                    # Save updated registry (no-op unless something was pruned)
+                    self._save_font_registry()
+
+                    self._fonts_cache = fonts
+                return list(self._fonts_cache)
 
         except Exception as e:
             raise Exception(f"Failed to list fonts: {str(e)}")
 
-    async def get_font_info(self, font_id: str) -> Optional[Dict[str, Any]]:
+    def refresh_fonts(self) -> List[Dict[str, Any]]:
+        """Drop the cached font list and rescan the registry"""
+        with self._registry_lock:
+            self._fonts_cache = None
+        return self.list_fonts()
+
+    def get_font_info(self, font_id: str) -> Optional[Dict[str, Any]]:
         """Get information about a specific font"""
         try:
             # Check web-safe fonts
@@ -298,7 +427,7 @@ class FontManager:
             print(f"Error getting font info: {e}")
             return None
 
-    async def delete_font(self, font_id: str) -> bool:
+    def delete_font(self, font_id: str) -> bool:
         """Delete an uploaded font"""
         try:
             if font_id not in self.font_registry:
@@ -311,11 +440,12 @@ class FontManager:
             if font_path.exists():
                 font_path.unlink()
 
-            # Remove from registry
-            del self.font_registry[font_id]
-
-            # Save updated registry
-            self._save_font_registry()
+            # Remove from registry and save
+            with self._registry_lock:
+                self.font_registry.pop(font_id, None)
+                self._dirty = True
+                self._save_font_registry()
+                self._fonts_cache = None
 
             return True
 
@@ -323,21 +453,23 @@ class FontManager:
             print(f"Error deleting font: {e}")
             return False
 
-    async def get_font_css(self, font_id: str) -> Optional[str]:
+    def get_font_css(self, font_id: str) -> Optional[str]:
         """Generate CSS @font-face rule for uploaded font"""
         try:
-            font_info = await self.get_font_info(font_id)
+            font_info = self.get_font_info(font_id)
 
             if not font_info or font_info.get("web_safe", False):
                 return None
 
-            font_path = Path(font_info["path"])
-            if not font_path.exists():
+            try:
+                stat = os.stat(font_info["path"])
+            except FileNotFoundError:
                 return None
 
-            # Read font file and encode as base64
-            with open(font_path, "rb") as f:
-                font_data = base64.b64encode(f.read()).decode("utf-8")
+            # Read font file and encode as base64 (cached per file version)
+            font_data = _encode_font_file(
+                font_info["path"], stat.st_mtime_ns, stat.st_size
+            )
 
             # Determine MIME type
             format_map = {
@@ -363,15 +495,19 @@ class FontManager:
             print(f"Error generating font CSS: {e}")
             return None
 
-    async def cleanup_unused_fonts(self) -> int:
+    def cleanup_unused_fonts(self) -> int:
         """Remove font files that are not in the registry"""
         try:
             removed_count = 0
 
-            # Get all font files in directory
-            font_files = []
-            for ext in self.supported_formats:
-                font_files.extend(self.fonts_dir.glob(f"*{ext}"))
+            # Get all font files in directory (one scan for every extension)
+            exts = set(self.supported_formats)
+            with os.scandir(self.fonts_dir) as entries:
+                font_files = [
+                    Path(entry.path)
+                    for entry in entries
+                    if os.path.splitext(entry.name)[1] in exts and entry.is_file()
+                ]
 
             # Get registered font paths
             registered_paths = {
@@ -403,16 +539,17 @@ class FontManager:
             uploaded_fonts = len(self.font_registry)
             web_safe_fonts = len(self.web_safe_fonts)
 
-            # Calculate total file size
+            # Total size and per-type counts in one pass over the registry,
+            # using the size recorded at registration instead of re-stat-ing
             total_size = 0
-            for font_info in self.font_registry.values():
-                font_path = Path(font_info["path"])
-                if font_path.exists():
-                    total_size += font_path.stat().st_size
-
-            # Group by type
             font_types = {}
             for font_info in self.font_registry.values():
+                file_size = font_info.get("file_size")
+                if file_size is None:
+                    font_path = Path(font_info["path"])
+                    file_size = font_path.stat().st_size if font_path.exists() else 0
+                total_size += file_size
+
                 font_type = font_info.get("type", "unknown")
                 font_types[font_type] = font_types.get(font_type, 0) + 1
 
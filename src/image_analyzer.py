@@ -2,16 +2,47 @@ import cv2
 import numpy as np
 import easyocr
 from colorthief import ColorThief
-from PIL import Image, ImageFont, ImageDraw
+from PIL import Image, ImageFont, ImageDraw, UnidentifiedImageError
 import torch
 from ultralytics import YOLO
-from sklearn.cluster import KMeans
 import os
+import re
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Tuple, Any
 import json
 from pathlib import Path
 
+# Refuse decompression bombs from the header, before any pixels are decoded
+Image.MAX_IMAGE_PIXELS = 64_000_000
+
+# Pixels fed to k-means; enough for a stable 5-color palette
+KMEANS_SAMPLE_SIZE = 20_000
+
+# Placeholder keywords in precedence order; one alternation per placeholder
+_PLACEHOLDER_RULES = [
+    (re.compile("|".join(map(re.escape, words))), placeholder)
+    for words, placeholder in [
+        (("title", "heading", "main"), "{TITLE}"),
+        (("subtitle", "subheading"), "{SUBTITLE}"),
+        (("description", "desc", "about"), "{DESCRIPTION}"),
+        (("author", "by", "creator"), "{AUTHOR}"),
+        (("date", "time", "when"), "{DATE}"),
+        (("category", "tag", "type"), "{CATEGORY}"),
+        (("quote", "saying"), "{QUOTE}"),
+        (("price", "$", "cost"), "{PRICE}"),
+        (("website", "site", "url"), "{SITE_NAME}"),
+    ]
+]
+
+
+def _bbox_extents(ocr_results: List[Tuple]) -> List[List[int]]:
+    """Axis-aligned [x1, y1, x2, y2] for each OCR quad, in one vectorized pass"""
+    quads = np.asarray([bbox for bbox, _, _ in ocr_results], dtype=np.float64)
+    quads = quads.reshape(-1, 4, 2)
+    extents = np.concatenate((quads.min(axis=1), quads.max(axis=1)), axis=1)
+    return extents.astype(np.int64).tolist()
+
 
 class ImageAnalyzer:
     def __init__(self):
@@ -27,46 +58,70 @@ class ImageAnalyzer:
     def analyze_image(self, image_path: str) -> Dict[str, Any]:
         """Comprehensive image analysis for template generation"""
         try:
-            # Load image
-            image = cv2.imread(image_path)
-            if image is None:
+            # Open lazily: only the header is parsed until pixels are needed
+            try:
+                pil_image = Image.open(image_path)
+            except Image.DecompressionBombError:
+                raise ValueError("Image dimensions exceed the analysis limit")
+            except (UnidentifiedImageError, OSError):
                 raise ValueError("Could not load image")
-            
-            # Get image dimensions
-            height, width = image.shape[:2]
 
-            # Try lightweight analysis first (faster, less resource intensive)
-            try:
-                return self._analyze_image_lightweight(image_path, width, height)
-            except Exception as light_error:
-                print(f"Lightweight analysis failed, trying full analysis: {light_error}")
-                # Fall back to full analysis
-                return self._analyze_image_full(image_path, width, height)
-                
+            with pil_image:
+                # Get image dimensions
+                width, height = pil_image.size
+
+                # Pillow only raises at twice MAX_IMAGE_PIXELS (below that it just
+                # warns), and cv2.imread has no cap; enforce the limit here
+                if width * height > Image.MAX_IMAGE_PIXELS:
+                    raise ValueError("Image dimensions exceed the analysis limit")
+
+                # Try lightweight analysis first (faster, less resource intensive)
+                try:
+                    return self._analyze_image_lightweight(pil_image, width, height)
+                except Exception as light_error:
+                    print(f"Lightweight analysis failed, trying full analysis: {light_error}")
+
+            # Fall back to full analysis
+            return self._analyze_image_full(image_path, width, height)
+
+        except ValueError:
+            # Invalid or oversized input, not an analysis fault
+            raise
         except Exception as e:
             raise Exception(f"Image analysis failed: {str(e)}")
 
-    def _analyze_image_lightweight(self, image_path: str, width: int, height: int) -> Dict[str, Any]:
+    def analyze_images(
+        self, image_paths: List[str], max_workers: int = 8
+    ) -> List[Dict[str, Any]]:
+        """Analyze several images in parallel; results follow input order.
+
+        OpenCV, Pillow and the OCR backend release the GIL in native code, so
+        threads overlap well. Keep max_workers around min(CPU count, 8).
+        """
+        with ThreadPoolExecutor(
+            max_workers=min(max_workers, len(image_paths) or 1)
+        ) as executor:
+            return list(executor.map(self.analyze_image, image_paths))
+
+    def _analyze_image_lightweight(self, pil_image: Image.Image, width: int, height: int) -> Dict[str, Any]:
         """Lightweight analysis without heavy AI dependencies"""
         try:
             # Basic color extraction using PIL (faster than ColorThief)
-            from PIL import Image
-            import numpy as np
-            
-            pil_image = Image.open(image_path)
-            pil_image = pil_image.resize((100, 100))  # Resize for speed
-            img_array = np.array(pil_image)
+            # JPEGs are downscaled by libjpeg during decode; no-op for other formats
+            pil_image.draft("RGB", (128, 128))
+            # In-place, aspect-preserving downscale (reduces in steps for big images)
+            pil_image.thumbnail((100, 100), Image.Resampling.BILINEAR)
+            pil_image = pil_image.convert("RGB")
             
             # Simple color analysis
             colors_list = []
             try:
-                # Get dominant colors using simple method
-                pixels = img_array.reshape(-1, 3)
-                unique_colors, counts = np.unique(pixels, axis=0, return_counts=True)
-                top_colors = unique_colors[np.argsort(counts)[-5:]]  # Top 5 colors
-                
-                for i, color in enumerate(top_colors):
-                    hex_color = "#{:02x}{:02x}{:02x}".format(*color)
+                # Get dominant colors with Pillow's C octree quantizer
+                quantized = pil_image.quantize(colors=5, method=Image.Quantize.FASTOCTREE)
+                palette = quantized.getpalette()
+                # getcolors() yields (count, palette index); keep ascending count order
+                for i, (_, idx) in enumerate(sorted(quantized.getcolors())):
+                    hex_color = "#{:02x}{:02x}{:02x}".format(*palette[idx * 3:idx * 3 + 3])
                     colors_list.append({"type": "dominant", "color": hex_color, "index": i})
             except:
                 colors_list = [{"type": "fallback", "color": "#ffffff"}]
@@ -103,13 +158,30 @@ class ImageAnalyzer:
 
     def _analyze_image_full(self, image_path: str, width: int, height: int) -> Dict[str, Any]:
         """Full analysis with all AI dependencies"""
+        # Decode once and share the pixels across all analysis tasks
+        image = cv2.imread(image_path)
+        if image is None:
+            raise ValueError("Could not load image")
+
+        # Grayscale and edge maps are shared by the OCR, layout and background passes
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        edges = cv2.Canny(gray, 50, 150)
+
         # Perform all analysis tasks (synchronously for thread execution)
-        colors_data = self._extract_colors(image_path)
-        fonts_data = self._detect_fonts(cv2.imread(image_path))
-        text_elements = self._extract_text(cv2.imread(image_path))
-        layout_structure = self._analyze_layout(cv2.imread(image_path))
-        image_regions = self._detect_image_regions(cv2.imread(image_path))
-        background_info = self._analyze_background(cv2.imread(image_path))
+        colors_data = self._extract_colors(image_path, image)
+
+        # One OCR pass feeds both font detection and text extraction
+        try:
+            ocr_results = self.ocr_reader.readtext(gray, detail=1)
+        except Exception as e:
+            fonts_data = {"error": f"Font detection failed: {str(e)}"}
+            text_elements = [{"error": f"Text extraction failed: {str(e)}"}]
+        else:
+            fonts_data = self._detect_fonts(ocr_results)
+            text_elements = self._extract_text(ocr_results)
+        layout_structure = self._analyze_layout(gray, edges)
+        image_regions = self._detect_image_regions(image, gray)
+        background_info = self._analyze_background(image, gray)
 
         # Convert to expected Pydantic format
         # colors should be a list, fonts should be a list
@@ -148,7 +220,7 @@ class ImageAnalyzer:
             "analysis_complete": True,
         }
 
-    def _extract_colors(self, image_path: str) -> Dict[str, Any]:
+    def _extract_colors(self, image_path: str, image: np.ndarray) -> Dict[str, Any]:
         """Extract dominant colors from the image"""
         try:
             # Use ColorThief for dominant colors
@@ -162,21 +234,34 @@ class ImageAnalyzer:
             dominant_hex = "#{:02x}{:02x}{:02x}".format(*dominant_color)
             palette_hex = ["#{:02x}{:02x}{:02x}".format(*color) for color in palette]
 
-            # Additional color analysis using OpenCV
+            # Additional color analysis using OpenCV on the already-decoded pixels
 
-            image = cv2.imread(image_path)
             image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
 
-            # Reshape for clustering
+            # Reshape for clustering; a uniform subsample carries the same palette
 
             pixels = image_rgb.reshape(-1, 3)
+            if len(pixels) > KMEANS_SAMPLE_SIZE:
+                rng = np.random.default_rng(42)
+                pixels = pixels[
+                    rng.choice(len(pixels), size=KMEANS_SAMPLE_SIZE, replace=False)
+                ]
+
+            # Use OpenCV's k-means to find color clusters
+
+            cv2.setRNGSeed(42)
+            _, labels, centers = cv2.kmeans(
+                pixels.astype(np.float32),
+                5,
+                None,
+                (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 10, 1.0),
+                1,
+                cv2.KMEANS_PP_CENTERS,
+            )
 
-            # Use KMeans to find color clusters
-
-            kmeans = KMeans(n_clusters=5, random_state=42, n_init=10)
-            kmeans.fit(pixels)
-
-            cluster_colors = kmeans.cluster_centers_.astype(int)
+            # Most populous cluster first
+            counts = np.bincount(labels.ravel(), minlength=len(centers))
+            cluster_colors = centers[np.argsort(-counts, kind="stable")].astype(int)
             cluster_hex = [
                 "#{:02x}{:02x}{:02x}".format(*color) for color in cluster_colors
             ]
@@ -190,28 +275,13 @@ class ImageAnalyzer:
         except Exception as e:
             return {"error": f"Color extraction failed: {str(e)}"}
 
-    def _detect_fonts(self, image: np.ndarray) -> Dict[str, Any]:
-        """Detect and analyze fonts in the image"""
+    def _detect_fonts(self, ocr_results: List[Tuple]) -> Dict[str, Any]:
+        """Detect and analyze fonts from OCR text regions"""
         try:
-            # Convert to grayscale for text analysis
-
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-
-            # Use OCR to get text regions with confidence
-
-            ocr_results = self.ocr_reader.readtext(gray, detail=1)
-
             font_info = []
-            for bbox, text, confidence in ocr_results:
+            extents = _bbox_extents(ocr_results)
+            for (_, text, confidence), (x1, y1, x2, y2) in zip(ocr_results, extents):
                 if confidence > 0.5:  # Filter low confidence detections
-                    # Extract text region
-
-                    x1, y1 = int(min([point[0] for point in bbox])), int(
-                        min([point[1] for point in bbox])
-                    )
-                    x2, y2 = int(max([point[0] for point in bbox])), int(
-                        max([point[1] for point in bbox])
-                    )
 
                     # Calculate text properties
 
@@ -231,7 +301,7 @@ class ImageAnalyzer:
                             "text": text,
                             "bbox": [x1, y1, x2, y2],
                             "estimated_size": estimated_font_size,
-                            "confidence": confidence,
+                            "confidence": float(confidence),
                             "char_density": char_density,
                             "text_type": self._classify_text_type(
                                 text, estimated_font_size
@@ -259,28 +329,22 @@ class ImageAnalyzer:
         else:
             return "body"
 
-    def _extract_text(self, image: np.ndarray) -> List[Dict[str, Any]]:
+    def _extract_text(self, ocr_results: List[Tuple]) -> List[Dict[str, Any]]:
         """Extract all text elements with positioning"""
         try:
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            ocr_results = self.ocr_reader.readtext(gray, detail=1)
-
             text_elements = []
-            for i, (bbox, text, confidence) in enumerate(ocr_results):
+            extents = _bbox_extents(ocr_results)
+            for i, ((_, text, confidence), (x1, y1, x2, y2)) in enumerate(
+                zip(ocr_results, extents)
+            ):
                 if confidence > 0.3:  # Lower threshold for text extraction
-                    x1, y1 = int(min([point[0] for point in bbox])), int(
-                        min([point[1] for point in bbox])
-                    )
-                    x2, y2 = int(max([point[0] for point in bbox])), int(
-                        max([point[1] for point in bbox])
-                    )
 
                     text_elements.append(
                         {
                             "id": f"text_{i}",
                             "content": text.strip(),
                             "bbox": [x1, y1, x2, y2],
-                            "confidence": confidence,
+                            "confidence": float(confidence),
                             "suggested_placeholder": self._suggest_placeholder(
                                 text.strip()
                             ),
@@ -296,40 +360,21 @@ class ImageAnalyzer:
 
         # Common patterns for different placeholder types
 
-        if any(word in text_lower for word in ["title", "heading", "main"]):
-            return "{TITLE}"
-        elif any(word in text_lower for word in ["subtitle", "subheading"]):
-            return "{SUBTITLE}"
-        elif any(word in text_lower for word in ["description", "desc", "about"]):
-            return "{DESCRIPTION}"
-        elif any(word in text_lower for word in ["author", "by", "creator"]):
-            return "{AUTHOR}"
-        elif any(word in text_lower for word in ["date", "time", "when"]):
-            return "{DATE}"
-        elif any(word in text_lower for word in ["category", "tag", "type"]):
-            return "{CATEGORY}"
-        elif any(word in text_lower for word in ["quote", "saying"]):
-            return "{QUOTE}"
-        elif any(word in text_lower for word in ["price", "$", "cost"]):
-            return "{PRICE}"
-        elif any(word in text_lower for word in ["website", "site", "url"]):
-            return "{SITE_NAME}"
-        elif len(text) > 50:
+        for pattern, placeholder in _PLACEHOLDER_RULES:
+            if pattern.search(text_lower):
+                return placeholder
+
+        if len(text) > 50:
             return "{DESCRIPTION}"
         elif len(text) < 10:
             return "{TAG}"
         else:
             return "{TITLE}"
 
-    def _analyze_layout(self, image: np.ndarray) -> Dict[str, Any]:
+    def _analyze_layout(self, gray: np.ndarray, edges: np.ndarray) -> Dict[str, Any]:
         """Analyze layout structure using computer vision"""
         try:
-            height, width = image.shape[:2]
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-
-            # Edge detection for layout analysis
-
-            edges = cv2.Canny(gray, 50, 150)
+            height, width = gray.shape[:2]
 
             # Find contours for layout regions
 
@@ -419,7 +464,9 @@ class ImageAnalyzer:
         else:
             return "complex"
 
-    def _detect_image_regions(self, image: np.ndarray) -> List[Dict[str, Any]]:
+    def _detect_image_regions(
+        self, image: np.ndarray, gray: np.ndarray
+    ) -> List[Dict[str, Any]]:
         """Detect and classify image regions"""
         try:
             height, width = image.shape[:2]
@@ -450,7 +497,7 @@ class ImageAnalyzer:
             # Fallback: Use color segmentation for image detection
 
             if not image_regions:
-                image_regions = self._detect_images_by_segmentation(image)
+                image_regions = self._detect_images_by_segmentation(image, gray)
             return image_regions
         except Exception as e:
             return [{"error": f"Image region detection failed: {str(e)}"}]
@@ -492,12 +539,11 @@ class ImageAnalyzer:
             return "unknown"
 
     def _detect_images_by_segmentation(
-        self, image: np.ndarray
+        self, image: np.ndarray, gray: np.ndarray
     ) -> List[Dict[str, Any]]:
         """Fallback method to detect image regions using color segmentation"""
         try:
             height, width = image.shape[:2]
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
 
             # Apply threshold to find distinct regions
 
@@ -534,7 +580,7 @@ class ImageAnalyzer:
         except Exception as e:
             return [{"error": f"Segmentation detection failed: {str(e)}"}]
 
-    def _analyze_background(self, image: np.ndarray) -> Dict[str, Any]:
+    def _analyze_background(self, image: np.ndarray, gray: np.ndarray) -> Dict[str, Any]:
         """Analyze background properties"""
         try:
             height, width = image.shape[:2]
@@ -550,13 +596,12 @@ class ImageAnalyzer:
                 image[-corner_size:, -corner_size:],  # Bottom-right
             ]
 
-            # Calculate average background color
+            # Calculate average background color (cv2.mean reads the views in place)
 
             bg_colors = []
             for corner in corners:
                 if corner.size > 0:
-                    mean_color = np.mean(corner, axis=(0, 1))
-                    bg_colors.append(mean_color)
+                    bg_colors.append(cv2.mean(corner)[:3])
             if bg_colors:
                 avg_bg_color = np.mean(bg_colors, axis=0)
                 bg_hex = "#{:02x}{:02x}{:02x}".format(
@@ -568,8 +613,8 @@ class ImageAnalyzer:
                 bg_hex = "#ffffff"
             # Detect if background has patterns or gradients
 
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            bg_variance = np.var(gray)
+            _, std_dev = cv2.meanStdDev(gray)
+            bg_variance = float(std_dev[0, 0]) ** 2
 
             bg_type = (
                 "solid"
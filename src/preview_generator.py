@@ -2,16 +2,63 @@ import cv2
 import numpy as np
 from PIL import Image, ImageDraw, ImageFont
 import xml.etree.ElementTree as ET
-import requests
-import os
-import tempfile
-from typing import Dict, List, Any, Optional
+import io
+from typing import Dict, List, Any, Optional, Tuple
 import json
 import random
 from datetime import datetime
+from functools import lru_cache
 from .stock_photo_service import StockPhotoService
 
 
+@lru_cache(maxsize=32)
+def _load_font(size: int) -> ImageFont.ImageFont:
+    """Load the preview font at the given size, cached across renders"""
+    try:
+        return ImageFont.truetype("arial.ttf", size)
+    except Exception:
+        return ImageFont.load_default()
+
+
+# Scratch drawing context used only for text measurement
+_MEASURE_DRAW = ImageDraw.Draw(Image.new("L", (1, 1)))
+
+
+@lru_cache(maxsize=256)
+def _text_mask(text: str, size: int) -> Tuple[Image.Image, Tuple[int, int]]:
+    """Rasterize text once per (text, size) as an L mask plus its bbox offset"""
+    font = _load_font(size)
+    # Measure through ImageDraw so labels with "\n" get their full multiline box
+    left, top, right, bottom = _MEASURE_DRAW.multiline_textbbox((0, 0), text, font=font)
+    mask = Image.new("L", (max(right - left, 1), max(bottom - top, 1)), 0)
+    ImageDraw.Draw(mask).text((-left, -top), text, fill=255, font=font)
+    return mask, (left, top)
+
+
+# Margin around the dashed border mask so width-2 lines are not clipped
+_DASH_MASK_PAD = 2
+
+
+@lru_cache(maxsize=32)
+def _dashed_border_mask(width: int, height: int) -> Image.Image:
+    """Build the dashed placeholder border once per box size as an L mask"""
+    pad = _DASH_MASK_PAD
+    mask = Image.new("L", (width + 2 * pad + 1, height + 2 * pad + 1), 0)
+    draw = ImageDraw.Draw(mask)
+    x1, y1, x2, y2 = pad, pad, pad + width, pad + height
+
+    dash_length = 5
+    for x in range(x1, x2, dash_length * 2):
+        draw.line([x, y1, min(x + dash_length, x2), y1], fill=255, width=2)
+        draw.line([x, y2, min(x + dash_length, x2), y2], fill=255, width=2)
+
+    for y in range(y1, y2, dash_length * 2):
+        draw.line([x1, y, x1, min(y + dash_length, y2)], fill=255, width=2)
+        draw.line([x2, y, x2, min(y + dash_length, y2)], fill=255, width=2)
+
+    return mask
+
+
 class PreviewGenerator:
     def __init__(self, stock_photo_service=None):
         self.stock_service = stock_photo_service or StockPhotoService()
@@ -41,7 +88,7 @@ class PreviewGenerator:
             "{NUMBER}": "42",
         }
 
-    async def create_preview(
+    def create_preview(
         self, template_path: str, analysis: Dict[str, Any], template_name: str
     ) -> Dict[str, Any]:
         """Create JPEG preview from SVG template with sample content"""
@@ -58,13 +105,14 @@ class PreviewGenerator:
             height = int(root.attrib.get("height", 600))
 
             # Create preview image
-            preview_image = await self._render_preview(root, width, height, analysis)
+            preview_image = self._render_preview(root, width, height, analysis)
 
             # Save preview
             preview_filename = f"{self._sanitize_filename(template_name)}.jpg"
             preview_path = f"previews/{preview_filename}"
 
-            preview_image.save(preview_path, "JPEG", quality=85, optimize=True)
+            # Skip optimize: the extra Huffman pass costs more than it saves here
+            preview_image.save(preview_path, "JPEG", quality=85)
 
             return {
                 "preview_path": preview_path,
@@ -76,29 +124,24 @@ class PreviewGenerator:
         except Exception as e:
             raise Exception(f"Preview generation failed: {str(e)}")
 
-    async def _render_preview(
+    def _render_preview(
         self, svg_root: ET.Element, width: int, height: int, analysis: Dict[str, Any]
     ) -> Image.Image:
         """Render SVG template as PIL Image with sample content"""
         try:
-            # Create blank image
-            preview = Image.new("RGB", (width, height), "white")
+            # Allocate the canvas once, already filled with the SVG background
+            bg_color = self._extract_background_color(svg_root) or "white"
+            preview = Image.new("RGB", (width, height), bg_color)
             draw = ImageDraw.Draw(preview)
 
-            # Get background color from SVG
-            bg_color = self._extract_background_color(svg_root)
-            if bg_color:
-                preview = Image.new("RGB", (width, height), bg_color)
-                draw = ImageDraw.Draw(preview)
-
             # Process image placeholders first
-            await self._render_image_placeholders(draw, svg_root, analysis)
+            self._render_image_placeholders(preview, draw, svg_root, analysis)
 
             # Process text elements
-            await self._render_text_elements(draw, svg_root)
+            self._render_text_elements(draw, svg_root)
 
             # Process decorative elements
-            await self._render_decorative_elements(draw, svg_root)
+            self._render_decorative_elements(draw, svg_root)
 
             return preview
 
@@ -131,8 +174,12 @@ class PreviewGenerator:
         except Exception:
             return None
 
-    async def _render_image_placeholders(
-        self, draw: ImageDraw.Draw, svg_root: ET.Element, analysis: Dict[str, Any]
+    def _render_image_placeholders(
+        self,
+        preview: Image.Image,
+        draw: ImageDraw.Draw,
+        svg_root: ET.Element,
+        analysis: Dict[str, Any],
     ):
         """Render image placeholders with stock photos or placeholder graphics"""
         try:
@@ -151,39 +198,21 @@ class PreviewGenerator:
 
                 if image_type == "real_photo":
                     # Try to get stock photo
-                    stock_image = await self._get_stock_image(img_width, img_height)
+                    stock_image = self._get_stock_image(img_width, img_height)
                     if stock_image:
-                        # Resize and paste stock image
+                        # Decode JPEGs near the target size, then resize
+                        stock_image.draft("RGB", (img_width, img_height))
                         stock_image = stock_image.resize(
-                            (img_width, img_height), Image.Resampling.LANCZOS
+                            (img_width, img_height),
+                            Image.Resampling.LANCZOS,
+                            reducing_gap=3.0,
                         )
                         # Convert to RGB if necessary
                         if stock_image.mode != "RGB":
                             stock_image = stock_image.convert("RGB")
 
-                        # Paste onto preview (need to handle this differently with PIL)
-                        # For now, we'll draw a colored rectangle as placeholder
-                        draw.rectangle(
-                            [x1, y1, x2, y2], fill="#4CAF50", outline="#45a049", width=2
-                        )
-
-                        # Add "Stock Photo" text
-                        try:
-                            font = ImageFont.truetype(
-                                "arial.ttf", min(16, img_height // 4)
-                            )
-                        except:
-                            font = ImageFont.load_default()
-
-                        text = "Stock Photo"
-                        text_bbox = draw.textbbox((0, 0), text, font=font)
-                        text_width = text_bbox[2] - text_bbox[0]
-                        text_height = text_bbox[3] - text_bbox[1]
-
-                        text_x = x1 + (img_width - text_width) // 2
-                        text_y = y1 + (img_height - text_height) // 2
-
-                        draw.text((text_x, text_y), text, fill="white", font=font)
+                        # Paste onto preview (clipped to the canvas by PIL)
+                        preview.paste(stock_image, (x1, y1))
                     else:
                         # Fallback to colored placeholder
                         draw.rectangle(
@@ -196,53 +225,41 @@ class PreviewGenerator:
                     )
 
                     # Draw dashed border effect (simplified)
-                    dash_length = 5
-                    for x in range(x1, x2, dash_length * 2):
-                        draw.line(
-                            [x, y1, min(x + dash_length, x2), y1],
-                            fill="#cccccc",
-                            width=2,
-                        )
-                        draw.line(
-                            [x, y2, min(x + dash_length, x2), y2],
-                            fill="#cccccc",
-                            width=2,
-                        )
-
-                    for y in range(y1, y2, dash_length * 2):
-                        draw.line(
-                            [x1, y, x1, min(y + dash_length, y2)],
-                            fill="#cccccc",
-                            width=2,
-                        )
-                        draw.line(
-                            [x2, y, x2, min(y + dash_length, y2)],
-                            fill="#cccccc",
-                            width=2,
-                        )
+                    draw.bitmap(
+                        (x1 - _DASH_MASK_PAD, y1 - _DASH_MASK_PAD),
+                        _dashed_border_mask(img_width, img_height),
+                        fill="#cccccc",
+                    )
 
                     # Add placeholder text
-                    try:
-                        font = ImageFont.truetype("arial.ttf", min(16, img_height // 4))
-                    except:
-                        font = ImageFont.load_default()
-
                     placeholder_tag = region.get("placeholder_tag", f"{{IMAGE_{i+1}}}")
-                    text_bbox = draw.textbbox((0, 0), placeholder_tag, font=font)
-                    text_width = text_bbox[2] - text_bbox[0]
-                    text_height = text_bbox[3] - text_bbox[1]
-
-                    text_x = x1 + (img_width - text_width) // 2
-                    text_y = y1 + (img_height - text_height) // 2
-
-                    draw.text(
-                        (text_x, text_y), placeholder_tag, fill="#666666", font=font
+                    self._draw_centered_label(
+                        draw, placeholder_tag, x1, y1, img_width, img_height, "#666666"
                     )
 
         except Exception as e:
             print(f"Error rendering image placeholders: {e}")
 
-    async def _render_text_elements(self, draw: ImageDraw.Draw, svg_root: ET.Element):
+    def _draw_centered_label(
+        self,
+        draw: ImageDraw.Draw,
+        text: str,
+        x: int,
+        y: int,
+        width: int,
+        height: int,
+        fill: str,
+    ):
+        """Center a label in a box, reusing the cached mask for both size and pixels"""
+        mask, (left, top) = _text_mask(text, min(16, height // 4))
+        text_width, text_height = mask.size
+
+        text_x = x + (width - text_width) // 2
+        text_y = y + (height - text_height) // 2
+
+        draw.bitmap((text_x + left, text_y + top), mask, fill=fill)
+
+    def _render_text_elements(self, draw: ImageDraw.Draw, svg_root: ET.Element):
         """Render text elements with sample content"""
         try:
             for text_elem in svg_root.iter("text"):
@@ -260,19 +277,14 @@ class PreviewGenerator:
                     if placeholder in text_content:
                         text_content = text_content.replace(placeholder, sample)
 
-                # Load font
-                try:
-                    font = ImageFont.truetype("arial.ttf", font_size)
-                except:
-                    font = ImageFont.load_default()
-
-                # Draw text
-                draw.text((x, y), text_content, fill=fill_color, font=font)
+                # Draw text from the cached glyph mask (same pixels as draw.text)
+                mask, (left, top) = _text_mask(text_content, font_size)
+                draw.bitmap((x + left, y + top), mask, fill=fill_color)
 
         except Exception as e:
             print(f"Error rendering text elements: {e}")
 
-    async def _render_decorative_elements(
+    def _render_decorative_elements(
         self, draw: ImageDraw.Draw, svg_root: ET.Element
     ):
         """Render decorative elements like borders, shapes"""
@@ -295,42 +307,32 @@ class PreviewGenerator:
                 stroke_color = rect.attrib.get("stroke", "none")
                 stroke_width = int(float(rect.attrib.get("stroke-width", 1)))
 
-                # Draw filled rectangle
-                if fill_color != "none" and fill_color:
-                    draw.rectangle([x, y, x + width, y + height], fill=fill_color)
+                fill = fill_color if fill_color and fill_color != "none" else None
+                outline = stroke_color if stroke_color and stroke_color != "none" else None
 
-                # Draw border
-                if stroke_color != "none" and stroke_color:
+                # Fill and border in one rasterization pass
+                if fill or outline:
                     draw.rectangle(
                         [x, y, x + width, y + height],
-                        outline=stroke_color,
+                        fill=fill,
+                        outline=outline,
                         width=stroke_width,
                     )
 
         except Exception as e:
             print(f"Error rendering decorative elements: {e}")
 
-    async def _get_stock_image(self, width: int, height: int) -> Optional[Image.Image]:
+    def _get_stock_image(self, width: int, height: int) -> Optional[Image.Image]:
         """Get stock image from APIs"""
         try:
             # Use stock photo service
-            stock_image_url = await self.stock_service.get_random_image(width, height)
+            stock_image_url = self.stock_service.get_random_image(width, height)
 
             if stock_image_url:
-                response = requests.get(stock_image_url, timeout=10)
+                response = self.stock_service.session.get(stock_image_url, timeout=10)
                 if response.status_code == 200:
-                    # Save to temporary file and load as PIL Image
-                    with tempfile.NamedTemporaryFile(
-                        delete=False, suffix=".jpg"
-                    ) as tmp_file:
-                        tmp_file.write(response.content)
-                        tmp_file.flush()
-
-                        image = Image.open(tmp_file.name)
-                        # Clean up temp file
-                        os.unlink(tmp_file.name)
-
-                        return image
+                    # Decode straight from the response body, no temp file
+                    return Image.open(io.BytesIO(response.content))
 
             return None
 
@@ -338,7 +340,7 @@ class PreviewGenerator:
             print(f"Error getting stock image: {e}")
             return None
 
-    async def generate_preview(
+    def generate_preview(
         self,
         svg_content: str,
         sample_text: dict = None,
@@ -349,9 +351,6 @@ class PreviewGenerator:
     ) -> Dict[str, Any]:
         """Generate preview image from SVG content with sample content"""
         try:
-            import io
-            from PIL import Image
-            
             # Parse SVG
             root = ET.fromstring(svg_content)
 
@@ -360,16 +359,16 @@ class PreviewGenerator:
             height = int(root.attrib.get("height", 600))
 
             # Create preview image
-            preview_image = await self._render_preview(root, width, height, {})
+            preview_image = self._render_preview(root, width, height, {})
 
             # Convert to bytes
             img_buffer = io.BytesIO()
             if format.lower() == "png":
-                preview_image.save(img_buffer, "PNG", quality=quality, optimize=True)
+                # Fast zlib level: previews are flat fills and compress well anyway
+                preview_image.save(img_buffer, "PNG", compress_level=1)
             else:
-                preview_image.save(img_buffer, "JPEG", quality=quality, optimize=True)
-            
-            img_buffer.seek(0)
+                preview_image.save(img_buffer, "JPEG", quality=quality)
+
             image_data = img_buffer.getvalue()
 
             return {
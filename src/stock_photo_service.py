@@ -16,6 +16,9 @@ class StockPhotoService:
         self.unsplash_key = unsplash_key or os.getenv("UNSPLASH_ACCESS_KEY", "")
         self.pexels_key = pexels_key or os.getenv("PEXELS_API_KEY", "")
 
+        # Shared HTTP session so connections are pooled across requests
+        self.session = requests.Session()
+
         # Cache for API responses
         self.cache = {}
         self.cache_duration = timedelta(hours=1)
@@ -43,7 +46,7 @@ class StockPhotoService:
             "https://picsum.photos/800/600?random=5",
         ]
 
-    async def get_random_image(
+    def get_random_image(
         self, width: int = 800, height: int = 600, category: str = None
     ) -> Optional[str]:
         """Get random stock image URL with specified dimensions"""
@@ -53,7 +56,7 @@ class StockPhotoService:
 
             for api in apis:
                 try:
-                    image_url = await self._get_image_from_api(
+                    image_url = self._get_image_from_api(
                         api, width, height, category
                     )
                     if image_url:
@@ -63,26 +66,26 @@ class StockPhotoService:
                     continue
 
             # Fallback to Lorem Picsum
-            return await self._get_fallback_image(width, height)
+            return self._get_fallback_image(width, height)
 
         except Exception as e:
             print(f"Error getting stock image: {e}")
             return None
 
-    async def _get_image_from_api(
+    def _get_image_from_api(
         self, api: str, width: int, height: int, category: str = None
     ) -> Optional[str]:
         """Get image from specific API"""
         if api == "unsplash" and self.unsplash_key:
-            return await self._get_unsplash_image(width, height, category)
+            return self._get_unsplash_image(width, height, category)
         elif api == "pexels" and self.pexels_key:
-            return await self._get_pexels_image(width, height, category)
+            return self._get_pexels_image(width, height, category)
         elif api == "pixabay" and self.pixabay_key:
-            return await self._get_pixabay_image(width, height, category)
+            return self._get_pixabay_image(width, height, category)
         else:
             return None
 
-    async def _get_unsplash_image(
+    def _get_unsplash_image(
         self, width: int, height: int, category: str = None
     ) -> Optional[str]:
         """Get image from Unsplash API"""
@@ -101,7 +104,7 @@ class StockPhotoService:
             headers = {"Authorization": f"Client-ID {self.unsplash_key}"}
             params = {"query": category, "w": width, "h": height, "fit": "crop"}
 
-            response = requests.get(url, headers=headers, params=params, timeout=10)
+            response = self.session.get(url, headers=headers, params=params, timeout=10)
 
             if response.status_code == 200:
                 data = response.json()
@@ -127,7 +130,7 @@ class StockPhotoService:
             print(f"Unsplash API error: {e}")
             return None
 
-    async def _get_pexels_image(
+    def _get_pexels_image(
         self, width: int, height: int, category: str = None
     ) -> Optional[str]:
         """Get image from Pexels API"""
@@ -146,7 +149,7 @@ class StockPhotoService:
             headers = {"Authorization": self.pexels_key}
             params = {"query": category, "per_page": 20, "page": random.randint(1, 5)}
 
-            response = requests.get(url, headers=headers, params=params, timeout=10)
+            response = self.session.get(url, headers=headers, params=params, timeout=10)
 
             if response.status_code == 200:
                 data = response.json()
@@ -176,7 +179,7 @@ class StockPhotoService:
             print(f"Pexels API error: {e}")
             return None
 
-    async def _get_pixabay_image(
+    def _get_pixabay_image(
         self, width: int, height: int, category: str = None
     ) -> Optional[str]:
         """Get image from Pixabay API"""
@@ -203,7 +206,7 @@ class StockPhotoService:
                 "page": random.randint(1, 5),
             }
 
-            response = requests.get(url, params=params, timeout=10)
+            response = self.session.get(url, params=params, timeout=10)
 
             if response.status_code == 200:
                 data = response.json()
@@ -231,7 +234,7 @@ class StockPhotoService:
             print(f"Pixabay API error: {e}")
             return None
 
-    async def _get_fallback_image(self, width: int, height: int) -> str:
+    def _get_fallback_image(self, width: int, height: int) -> str:
         """Get fallback placeholder image"""
         try:
             # Use Lorem Picsum as fallback
@@ -250,7 +253,7 @@ class StockPhotoService:
         cached_time = self.cache[cache_key]["timestamp"]
         return datetime.now() - cached_time < self.cache_duration
 
-    async def get_themed_image(
+    def get_themed_image(
         self, theme: str, width: int = 800, height: int = 600
     ) -> Optional[str]:
         """Get image based on specific theme"""
@@ -269,7 +272,7 @@ class StockPhotoService:
         search_terms = theme_mapping.get(theme.lower(), [theme])
         selected_term = random.choice(search_terms)
 
-        return await self.get_random_image(width, height, selected_term)
+        return self.get_random_image(width, height, selected_term)
 
     def clear_cache(self):
         """Clear the image cache"""
@@ -286,7 +289,7 @@ class StockPhotoService:
             "cache_duration_hours": self.cache_duration.total_seconds() / 3600,
         }
 
-    async def test_apis(self) -> Dict[str, bool]:
+    def test_apis(self) -> Dict[str, bool]:
         """Test which APIs are working"""
         results = {
             "unsplash": False,
@@ -298,7 +301,7 @@ class StockPhotoService:
         # Test Unsplash
         if self.unsplash_key:
             try:
-                url = await self._get_unsplash_image(400, 300, "test")
+                url = self._get_unsplash_image(400, 300, "test")
                 results["unsplash"] = url is not None
             except:
                 pass
@@ -306,7 +309,7 @@ class StockPhotoService:
         # Test Pexels
         if self.pexels_key:
             try:
-                url = await self._get_pexels_image(400, 300, "test")
+                url = self._get_pexels_image(400, 300, "test")
                 results["pexels"] = url is not None
             except:
                 pass
@@ -314,14 +317,14 @@ class StockPhotoService:
         # Test Pixabay
         if self.pixabay_key:
             try:
-                url = await self._get_pixabay_image(400, 300, "test")
+                url = self._get_pixabay_image(400, 300, "test")
                 results["pixabay"] = url is not None
             except:
                 pass
 
         # Test fallback
         try:
-            url = await self._get_fallback_image(400, 300)
+            url = self._get_fallback_image(400, 300)
             results["fallback"] = url is not None
         except:
             pass
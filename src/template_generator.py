@@ -48,7 +48,7 @@ class TemplateGenerator:
             },
         }
 
-    async def create_template(
+    def create_template(
         self, analysis: Dict[str, Any], style: str = "modern", dimensions: tuple = (800, 600)
     ) -> Dict[str, Any]:
         """Create SVG template from image analysis"""
@@ -60,7 +60,7 @@ class TemplateGenerator:
             content_mapping = self._create_content_mapping(analysis)
 
             # Generate SVG template
-            svg_content = await self._create_svg_template(
+            svg_content = self._create_svg_template(
                 content_mapping, style_config, dimensions
             )
 
@@ -214,7 +214,7 @@ class TemplateGenerator:
             print(f"Error processing fonts: {e}")
             return ["Arial", "Helvetica", "Times New Roman"]
 
-    async def _create_svg_template(
+    def _create_svg_template(
         self, content_mapping: Dict[str, Any], style_config: Dict[str, Any], dimensions: tuple
     ) -> str:
         """Generate SVG template content"""
@@ -0,0 +1,25 @@
+from typing import Iterable
+
+from fastapi import Request
+from fastapi.responses import ORJSONResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+
+
+class UploadSizeLimitMiddleware(BaseHTTPMiddleware):
+    """Reject uploads by Content-Length before FastAPI parses the multipart body.
+
+    Requests without a usable Content-Length (chunked, or under-declared) pass
+    through; the upload routes enforce the limit on the streamed bytes.
+    """
+
+    def __init__(self, app, paths: Iterable[str], max_body_size: int):
+        super().__init__(app)
+        self.paths = frozenset(paths)
+        self.max_body_size = max_body_size
+
+    async def dispatch(self, request: Request, call_next):
+        if request.method == "POST" and request.url.path in self.paths:
+            content_length = request.headers.get("content-length", "")
+            if content_length.isdigit() and int(content_length) > self.max_body_size:
+                return ORJSONResponse({"detail": "File too large"}, status_code=413)
+        return await call_next(request)
@@ -0,0 +1,73 @@
+"""Tests for AnalysisRunner slot accounting."""
+
+import asyncio
+import threading
+
+import pytest
+
+from src.analysis_runner import AnalysisRunner
+
+
+async def wait_until(predicate, timeout=5.0):
+    """Poll predicate on the event loop until it holds or timeout passes"""
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline, "condition not met"
+        await asyncio.sleep(0.01)
+
+
+def test_cancelled_analysis_holds_its_slot_until_the_thread_finishes():
+    async def scenario():
+        runner = AnalysisRunner(max_concurrent=1, timeout=5.0)
+        started = threading.Event()
+        finish = threading.Event()
+
+        def slow_analysis():
+            started.set()
+            finish.wait(timeout=5)
+            return "slow"
+
+        try:
+            request = asyncio.create_task(runner.run(slow_analysis))
+            await wait_until(started.is_set)
+
+            # Client went away mid-analysis: the request task is cancelled
+            request.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await request
+
+            # The thread is still running, so the only slot stays taken
+            assert runner.active == 1
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(runner.run(lambda: "next"), timeout=0.2)
+
+            # Once the thread finishes the slot is released and reusable
+            finish.set()
+            await wait_until(lambda: runner.active == 0)
+            assert await runner.run(lambda: "next") == "next"
+        finally:
+            finish.set()
+            runner.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_timed_out_analysis_holds_its_slot_until_the_thread_finishes():
+    async def scenario():
+        runner = AnalysisRunner(max_concurrent=1, timeout=0.1)
+        finish = threading.Event()
+
+        try:
+            with pytest.raises(asyncio.TimeoutError):
+                await runner.run(finish.wait, 5)
+
+            assert runner.active == 1
+
+            finish.set()
+            await wait_until(lambda: runner.active == 0)
+            assert await runner.run(lambda: "done") == "done"
+        finally:
+            finish.set()
+            runner.shutdown()
+
+    asyncio.run(scenario())
@@ -0,0 +1,161 @@
+"""Tests for FontManager parsing and registry handling."""
+
+import contextlib
+import gc
+import threading
+import warnings
+from pathlib import Path
+
+import pytest
+from fontTools.fontBuilder import FontBuilder
+from fontTools.pens.ttGlyphPen import TTGlyphPen
+
+from src.font_manager import FontManager
+
+
+def build_font(path: Path, family: str = "Test Sans", style: str = "Bold") -> Path:
+    """Write a minimal TrueType font with the given name table entries"""
+    builder = FontBuilder(1000, isTTF=True)
+    builder.setupGlyphOrder([".notdef"])
+    builder.setupCharacterMap({})
+    builder.setupGlyf({".notdef": TTGlyphPen(None).glyph()})
+    builder.setupHorizontalMetrics({".notdef": (500, 0)})
+    builder.setupHorizontalHeader(ascent=800, descent=-200)
+    builder.setupNameTable({"familyName": family, "styleName": style})
+    builder.setupOS2()
+    builder.setupPost()
+    builder.save(str(path))
+    return path
+
+
+def test_extract_font_info_closes_the_font_file(tmp_path):
+    manager = FontManager(str(tmp_path))
+    font_path = build_font(tmp_path / "TestSans-Bold.ttf")
+    broken_path = tmp_path / "Broken.ttf"
+    broken_path.write_bytes(b"not a font")
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always", ResourceWarning)
+        info = manager._extract_font_info(font_path)
+        # The handle must also be closed when fontTools rejects the file
+        with contextlib.suppress(ValueError):
+            manager._extract_font_info(broken_path)
+        gc.collect()
+
+    assert info["family_name"] == "Test Sans"
+    assert info["weight"] == "700"
+    assert not [w for w in caught if issubclass(w.category, ResourceWarning)]
+
+
+def test_register_font_rejects_unreadable_files(tmp_path):
+    manager = FontManager(str(tmp_path))
+    for name in ("Garbage.ttf", "Garbage.woff2"):
+        (tmp_path / name).write_bytes(b"definitely not a font file")
+
+        with pytest.raises(ValueError, match="Unreadable font file"):
+            manager.register_font(str(tmp_path / name))
+
+    assert manager.font_registry == {}
+    assert not (tmp_path / "font_registry.json").exists()
+
+
+def test_list_fonts_never_caches_a_list_older_than_a_concurrent_register(tmp_path):
+    manager = FontManager(str(tmp_path))
+    font_path = build_font(tmp_path / "TestSans-Bold.ttf")
+    listing_started = threading.Event()
+    registered = threading.Event()
+
+    class SlowRegistry(dict):
+        """Snapshot entries, then pause so a register can land mid-listing"""
+
+        def items(self):
+            snapshot = list(super().items())
+            listing_started.set()
+            registered.wait(timeout=0.5)
+            return snapshot
+
+    manager.font_registry = SlowRegistry()
+
+    def register():
+        listing_started.wait(timeout=5)
+        manager.register_font(str(font_path))
+        registered.set()
+
+    registrar = threading.Thread(target=register)
+    registrar.start()
+    manager.list_fonts()
+    registrar.join(timeout=5)
+
+    listed_ids = {font.get("id") for font in manager.list_fonts()}
+    assert set(manager.font_registry) <= listed_ids
+    assert len(manager.font_registry) == 1
+
+
+def test_register_fonts_keeps_same_stem_files_apart(tmp_path):
+    manager = FontManager(str(tmp_path))
+    paths = [
+        build_font(tmp_path / "Roboto.ttf", family="Roboto", style="Regular"),
+        build_font(tmp_path / "Roboto.otf", family="Roboto", style="Regular"),
+    ]
+
+    entries = manager.register_fonts([str(path) for path in paths])
+
+    assert len({entry["id"] for entry in entries}) == 2
+    assert sorted(info["filename"] for info in manager.font_registry.values()) == [
+        "Roboto.otf",
+        "Roboto.ttf",
+    ]
+
+
+@pytest.mark.parametrize(
+    "family_name, expected",
+    [
+        ("Roboto Mono", "monospace"),
+        ("Courier New", "monospace"),
+        ("Source Code Pro", "monospace"),
+        ("Times New Roman", "serif"),
+        ("Noto Serif", "serif"),
+        ("EB Garamond", "serif"),
+        ("Brush Script MT", "cursive"),
+        ("Patrick Hand", "cursive"),
+        ("Open Sans", "sans-serif"),
+        ("Playfair Display", "sans-serif"),
+        # Several groups match: monospace beats serif beats cursive
+        ("Cascadia Mono Serif", "monospace"),
+        ("Console Script", "monospace"),
+        ("Georgia Script", "serif"),
+    ],
+)
+def test_determine_font_type_follows_rule_precedence(tmp_path, family_name, expected):
+    manager = FontManager(str(tmp_path))
+    assert manager._determine_font_type(family_name, "Regular") == expected
+
+
+@pytest.mark.parametrize(
+    "style_name, expected",
+    [
+        ("Thin", "100"),
+        ("Hairline", "100"),
+        ("ExtraLight", "200"),
+        ("UltraLight Italic", "200"),
+        ("Light", "300"),
+        ("Regular", "400"),
+        ("Italic", "400"),
+        ("Medium", "500"),
+        ("SemiBold", "600"),
+        ("DemiBold Italic", "600"),
+        ("Bold", "700"),
+        ("Black", "900"),
+        ("Heavy", "900"),
+        # Compound keywords rank as the first rule they contain, as in the
+        # original if/elif chain ("extrabold" contains "bold")
+        ("ExtraBold", "700"),
+        ("UltraBold", "700"),
+        ("Thin Bold", "100"),
+        ("Light Black", "300"),
+        ("Medium Bold", "500"),
+    ],
+)
+def test_extract_weight_follows_rule_precedence(tmp_path, style_name, expected):
+    manager = FontManager(str(tmp_path))
+    assert manager._extract_weight(style_name) == expected
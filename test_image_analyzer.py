@@ -0,0 +1,99 @@
+"""Tests for ImageAnalyzer result serialization."""
+
+import numpy as np
+import orjson
+import pytest
+from PIL import Image
+
+pytest.importorskip("easyocr")
+pytest.importorskip("ultralytics")
+pytest.importorskip("colorthief")
+
+from src.image_analyzer import ImageAnalyzer, _bbox_extents
+
+
+class NumpyOCRReader:
+    """Stands in for easyocr.Reader, which returns numpy coordinates and scores."""
+
+    def readtext(self, image, detail=1):
+        quad = [
+            [np.int32(10), np.int32(12)],
+            [np.int32(110), np.int32(12)],
+            [np.int32(110), np.int32(40)],
+            [np.int32(10), np.int32(40)],
+        ]
+        return [(quad, "Main Title", np.float64(0.93))]
+
+
+def test_full_analysis_with_numpy_ocr_scores_is_orjson_serializable(tmp_path):
+    image_path = tmp_path / "pin.png"
+    Image.new("RGB", (200, 300), (200, 80, 40)).save(image_path)
+
+    # Skip model loading; only the OCR reader is exercised on this path
+    analyzer = ImageAnalyzer.__new__(ImageAnalyzer)
+    analyzer.ocr_reader = NumpyOCRReader()
+    analyzer.yolo_model = None
+
+    result = analyzer._analyze_image_full(str(image_path), 200, 300)
+
+    assert result["fonts"][0]["confidence"] == pytest.approx(0.93)
+    assert type(result["text_elements"][0]["confidence"]) is float
+    # Plain orjson (no numpy option) must accept the analysis as-is
+    decoded = orjson.loads(orjson.dumps(result))
+    assert decoded["text_elements"][0]["bbox"] == [10, 12, 110, 40]
+    # main.py writes the analysis with OPT_SERIALIZE_NUMPY as a second guard
+    assert orjson.dumps(result, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+def test_bbox_extents_of_no_ocr_results_is_empty():
+    assert _bbox_extents([]) == []
+
+
+def test_bbox_extents_match_per_quad_min_max():
+    ocr_results = [
+        # Axis-aligned quad with numpy ints, as easyocr returns them
+        ([[np.int32(10), np.int32(12)], [np.int32(110), np.int32(12)],
+          [np.int32(110), np.int32(40)], [np.int32(10), np.int32(40)]], "a", 0.9),
+        # Rotated quad with float corners: extents truncate like int()
+        ([[50.7, 20.2], [90.9, 30.5], [80.1, 60.8], [40.3, 50.4]], "b", 0.8),
+    ]
+
+    extents = _bbox_extents(ocr_results)
+
+    assert extents == [[10, 12, 110, 40], [40, 20, 90, 60]]
+    assert all(type(value) is int for box in extents for value in box)
+
+
+# Band colors (RGB) and their share of the image height, largest first
+PALETTE_BANDS = [
+    ((220, 40, 40), 40),
+    ((40, 160, 60), 25),
+    ((30, 60, 200), 15),
+    ((240, 220, 60), 12),
+    ((20, 20, 20), 8),
+]
+
+
+def write_banded_image(path, size):
+    """Save a size x size PNG of horizontal bands sized by PALETTE_BANDS"""
+    image = np.zeros((size, size, 3), dtype=np.uint8)
+    top = 0
+    for rgb, percent in PALETTE_BANDS:
+        bottom = top + size * percent // 100
+        image[top:bottom] = rgb
+        top = bottom
+    Image.fromarray(image).save(path)
+    # BGR, as cv2.imread would hand it to _extract_colors
+    return np.ascontiguousarray(image[:, :, ::-1])
+
+
+@pytest.mark.parametrize("size", [100, 400])  # 400x400 exceeds the k-means sample
+def test_cluster_colors_are_the_palette_ordered_by_population(tmp_path, size):
+    image_path = tmp_path / "bands.png"
+    image = write_banded_image(image_path, size)
+    analyzer = ImageAnalyzer.__new__(ImageAnalyzer)
+
+    colors = analyzer._extract_colors(str(image_path), image)
+
+    expected = ["#{:02x}{:02x}{:02x}".format(*rgb) for rgb, _ in PALETTE_BANDS]
+    assert colors["cluster_colors"] == expected
@@ -0,0 +1,34 @@
+"""Tests for PreviewGenerator rendering."""
+
+import xml.etree.ElementTree as ET
+
+from PIL import Image, ImageDraw
+
+from src.preview_generator import PreviewGenerator
+from src.stock_photo_service import StockPhotoService
+
+SVG = (
+    '<svg width="120" height="90">'
+    '<rect x="0" y="0" width="120" height="90" fill="#fafafa"/>'
+    '<rect x="10" y="10" width="40" height="30" fill="#ff0000" stroke="#0000ff" stroke-width="3"/>'
+    '<rect x="60" y="40" width="50" height="40" fill="none" stroke="#00aa00" stroke-width="2"/>'
+    "</svg>"
+)
+
+
+def test_decorative_rects_match_separate_fill_and_outline_passes():
+    generator = PreviewGenerator(StockPhotoService())
+    root = ET.fromstring(SVG)
+
+    # Earlier passes (text, placeholders) leave pixels the background rect covers
+    rendered = Image.new("RGB", (120, 90), "black")
+    generator._render_decorative_elements(ImageDraw.Draw(rendered), root)
+
+    expected = Image.new("RGB", (120, 90), "black")
+    draw = ImageDraw.Draw(expected)
+    draw.rectangle([0, 0, 120, 90], fill="#fafafa")
+    draw.rectangle([10, 10, 50, 40], fill="#ff0000")
+    draw.rectangle([10, 10, 50, 40], outline="#0000ff", width=3)
+    draw.rectangle([60, 40, 110, 80], outline="#00aa00", width=2)
+
+    assert rendered.tobytes() == expected.tobytes()
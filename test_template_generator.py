@@ -0,0 +1,42 @@
+"""Tests for TemplateGenerator SVG output."""
+
+from src.font_manager import FontManager
+from src.stock_photo_service import StockPhotoService
+from src.template_generator import TemplateGenerator
+
+ANALYSIS = {
+    "dimensions": {"width": 1000, "height": 1500},
+    "colors": [{"type": "dominant", "color": "#c85028"}],
+    "fonts": [],
+    "text_elements": [
+        {
+            "id": "text_0",
+            "content": "Main Title",
+            "bbox": [10, 12, 110, 40],
+            "confidence": 0.93,
+            "suggested_placeholder": "{TITLE}",
+        }
+    ],
+    "image_regions": [
+        {"id": "image_1", "bbox": [20, 60, 220, 260], "type": "real_photo"}
+    ],
+    "layout_structure": {"layout_type": "simple"},
+    "background_info": {"background_color": "#ffffff"},
+}
+
+
+def test_create_template_as_called_by_the_api_returns_real_svg(tmp_path, monkeypatch):
+    # create_template writes templates/<id>.svg relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    generator = TemplateGenerator(
+        font_manager=FontManager(str(tmp_path / "fonts")),
+        stock_photo_service=StockPhotoService(),
+    )
+
+    # Same call shape as main.generate_template
+    result = generator.create_template(ANALYSIS, "modern")
+
+    svg = result["svg_content"]
+    assert "Template Generation Error" not in svg
+    assert "{TEXT_1}" in svg
+    assert "{IMAGE_1}" in svg